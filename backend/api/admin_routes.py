@@ -4,6 +4,14 @@ from typing import List
 from db.services import admin_module_service, admin_user_service, admin_role_service
 from db.services.admin_user_service import delete_user as delete_user_by_id
 from db.services import auth_service
+from grader.batch_encoder import batch_encoder
+from grader.grade_cache import grade_cache
+from grader import mcq, retry_policy, ollama_client
+from grader.model_router import loaded_modules
+from grader.llm import generation_stats
+from grader import registry
+from backtask import job_queue
+from db.services import grading_job_service, grading_trace_service
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -96,4 +104,86 @@ def delete_user(user_id: int, data: dict = Body(...)):
 
 @router.get("/roles", response_model=List[dict])
 def get_roles():
-    return admin_role_service.get_all_roles()
\ No newline at end of file
+    return admin_role_service.get_all_roles()
+
+
+# -------------------------------
+# GRADER ENDPOINTS
+# -------------------------------
+# Modules that pull in faiss, sklearn or the embedding stack are imported
+# inside their handlers, so the API process stays light until asked.
+
+@router.get("/grader/embedding-stats")
+def get_embedding_stats():
+    return batch_encoder.stats()
+
+@router.get("/grader/cache-stats")
+def get_grade_cache_stats():
+    return grade_cache.stats()
+
+@router.get("/grader/fast-path-stats")
+def get_fast_path_stats():
+    return mcq.stats()
+
+@router.get("/grader/prescore-stats")
+def get_prescore_stats():
+    from grader import prescore
+    return prescore.stats()
+
+@router.get("/grader/retry-stats")
+def get_retry_stats():
+    return retry_policy.stats()
+
+@router.get("/grader/batching-stats")
+def get_batching_stats():
+    from grader import multi_answer
+    return multi_answer.stats()
+
+@router.get("/grader/format-stats")
+def get_format_stats():
+    from grader.rag_pipeline import format_stats
+    return format_stats()
+
+@router.get("/grader/generation-stats")
+def get_generation_stats():
+    return generation_stats()
+
+@router.get("/grader/jobs/stats")
+def get_grading_queue_stats():
+    return job_queue.stats()
+
+@router.get("/grader/jobs/dead", response_model=List[dict])
+def get_dead_grading_jobs(limit: int = 100):
+    return grading_job_service.get_dead_jobs(limit)
+
+@router.post("/grader/jobs/requeue-dead")
+def requeue_dead_grading_jobs(job_ids: List[int] = Body(default=None)):
+    return {"requeued": grading_job_service.requeue_dead_jobs(job_ids)}
+
+@router.get("/grader/latency")
+def get_grading_latency(minutes: int = 1440, module: str = None, exam_id: int = None):
+    """p50/p95 job and stage latency per module and per exam from gradingtrace."""
+    return grading_trace_service.get_latency_report(minutes, module, exam_id)
+
+@router.get("/grader/ollama-pool-stats")
+def get_ollama_pool_stats():
+    return ollama_client.stats()
+
+@router.get("/grader/loaded-modules")
+def get_loaded_grader_modules():
+    return loaded_modules()
+
+@router.get("/grader/modules", response_model=List[dict])
+def get_grader_modules():
+    return registry.all_modules()
+
+@router.post("/grader/modules")
+def register_grader_module(config: dict = Body(...), persist: bool = True, build: bool = False):
+    try:
+        config = registry.register_module(config, persist=persist)
+        if build:
+            from grader.build_indexes import build_module
+            build_module(config)
+        return {"message": "Grading module registered"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Request, HTTPException, Body
 from fastapi.responses import JSONResponse
-from db.services import lecturer_exam_service
+from db.services import lecturer_exam_service, grading_trace_service
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -132,4 +132,8 @@ def get_exam_results_route(exam_id: int):
     
     return {"results": results} 
 
- 
\ No newline at end of file
+ 
+# Grading latency for one exam (p50/p95 per module and stage)
+@router.get("/lecturer/exams/{exam_id}/grading-latency")
+def get_exam_grading_latency_route(exam_id: int, minutes: int = 1440):
+    return grading_trace_service.get_latency_report(minutes, exam_id=exam_id)
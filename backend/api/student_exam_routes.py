@@ -1,7 +1,9 @@
 # routes/student/student_exam_routes.py
 
 from fastapi import APIRouter, HTTPException
-from db.services import student_exam_service
+from db.services import student_exam_service, student_service
+from backtask.job_queue import enqueue_exam, GRADING_BATCH_MODE
+from grader import registry
 
 router = APIRouter()
 
@@ -13,6 +15,10 @@ def start_exam(user_id: int, exam_id: int):
 @router.post("/student/exam/submit")
 def submit_exam(user_id: int, exam_id: int):
     student_exam_service.update_exam_status(user_id, exam_id, "pending")
+    if GRADING_BATCH_MODE == "exam":
+        module_name = student_service.get_module_name_by_exam_id(exam_id)
+        model = registry.get_module_config(module_name)["llm"]["model"] if module_name in registry.module_names() else None
+        enqueue_exam(user_id, exam_id, module_name, model)
     return {"message": "Exam submitted and now pending"}
 
 @router.get("/student/exams/{user_id}")
@@ -1,16 +1,13 @@
-from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Request
 from typing import List, Dict
 from db.services import student_service, student_exam_service 
-from backtask.bgtask import process_grading
-from grader.model_router import route_model
+from backtask.job_queue import enqueue_answer, enqueue_exam, enqueue_question, GRADING_BATCH_MODE
+from grader import registry
 from pydantic import BaseModel
-from concurrent.futures import ThreadPoolExecutor
 import traceback
 
 router = APIRouter(prefix="/student", tags=["Student"])
 
-executor = ThreadPoolExecutor(max_workers=1)
-
 # 1. Get all exams with progress info (no filtering — frontend handles it)
 @router.get("/exams/all")
 def get_all_exams(user_id: int):
@@ -97,7 +94,7 @@ class SubmitAnswerRequest(BaseModel):
 #         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/submit")
-def submit_answer(data: dict, background_tasks: BackgroundTasks):
+def submit_answer(data: dict):
     try:
         print("Received data:", data)
 
@@ -114,11 +111,17 @@ def submit_answer(data: dict, background_tasks: BackgroundTasks):
         
         student_exam_service.update_exam_status(data["user_id"], data["exam_id"], "pending")
         
-        # Run grading only in background if finalized
+        # Queue grading only if finalized; the job survives API restarts
         if data.get("is_finalized"):
-            background_tasks.add_task(process_grading, data)
-            # executor.submit(process_grading, data)
-            print("[Main Thread] Submitted grading task to executor")
+            module_name = student_service.get_module_name_by_exam_id(data["exam_id"])
+            model = registry.get_module_config(module_name)["llm"]["model"] if module_name in registry.module_names() else None
+            if GRADING_BATCH_MODE == "exam":
+                job_id = enqueue_exam(data["user_id"], data["exam_id"], module_name, model)
+            elif GRADING_BATCH_MODE == "question_group":
+                job_id = enqueue_question(data["exam_id"], data["question_id"], module_name, model)
+            else:
+                job_id = enqueue_answer(data, module_name, model)
+            print(f"[Main Thread] Queued grading job {job_id}")
 
         return {"message": "Answer submitted"}  # ✅ Immediate response
     except Exception as e:
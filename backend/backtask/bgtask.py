@@ -1,34 +1,78 @@
-from db.services import student_service, student_exam_service
+from db.services import student_service, student_exam_service, question_context_service
 from grader.model_router import route_model
+from grader.batch_encoder import batch_encoder
+from grader import metrics
+from grader.mcq import METHOD as MCQ_METHOD
+from grader import question_context
 
+import asyncio
 import threading
 
 
-def process_grading(data: dict):
-        print(f"[Grading Thread] Started in thread: {threading.current_thread().name}")
-    
-        question_data = student_service.get_question_with_model_answer(data["question_id"])
+# Runs on the FastAPI event loop: the LLM call is awaited on the shared
+# Ollama client, blocking MySQL calls and module loading go to a worker
+# thread only for as long as they take. Each step is timed into the job's
+# trace (grader/metrics.py).
+async def _db(func, *args, **kwargs):
+    with metrics.stage("db"):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def _route(module_name: str):
+    metrics.annotate(module=module_name)
+    with metrics.stage("load_grader"):
+        graph = await asyncio.to_thread(route_model, module_name)
+    metrics.annotate(model=graph.config["llm"]["model"])
+    return graph
+
+
+def _annotate_result(result: dict):
+    telemetry = result.get("telemetry") or {}
+    method = result.get("method") or ""
+    metrics.annotate(
+        method=method,
+        cached=bool(result.get("cached")),
+        fast_path=method == MCQ_METHOD or method.startswith("prescore-"),
+        llm_calls=telemetry.get("attempts", 0),
+        retries=telemetry.get("retries", result.get("retry_count") or 0),
+    )
+
+
+async def process_grading(data: dict):
+    with metrics.job("answer", question_id=data["question_id"], exam_id=data["exam_id"]):
+        print(f"[Grading Task] Started in thread: {threading.current_thread().name}")
+
+        question_data = await _db(student_service.get_question_with_model_answer, data["question_id"])
         if not question_data:
             raise ValueError(f"No question data found for question_id {data['question_id']}")
 
         student_answer = data["studentAnswer"]
-        module_name = student_service.get_module_name_by_exam_id(data["exam_id"])
+        module_name = await _db(student_service.get_module_name_by_exam_id, data["exam_id"])
         if not module_name:
             raise ValueError(f"No module name found for exam_id {data['exam_id']}")
 
-        graph = route_model(module_name)
+        graph = await _route(module_name)
         input_data = {
             "question": question_data["QuestionName"],
             "student_answer": student_answer,
-            "model_answer": question_data["ModelAnswer"]
+            "model_answer": question_data["ModelAnswer"],
+            "reference_ids": question_context.resolve(
+                graph.config, question_data["QuestionName"], question_data["ModelAnswer"], question_data
+            )
         }
+        metrics.annotate(precomputed_context=input_data["reference_ids"] is not None)
 
-        result = graph.invoke(input_data)
-        print("LLM grading result:", result)
+        result = await graph.ainvoke(input_data)
+        _annotate_result(result)
+        if result.get("score") is None:
+            # No readable grade (e.g. every consensus sample failed): leave
+            # the answer ungraded and let the queue retry the job
+            raise RuntimeError(f"No grade for question_id {data['question_id']}: method={result.get('method')}")
 
         total_score = (result["score"] / 10) * data["question_mark"]
 
-        student_service.update_student_answer(
+        await _db(
+            student_service.update_student_answer,
             user_id=data["user_id"],
             exam_id=data["exam_id"],
             question_id=data["question_id"],
@@ -39,14 +83,141 @@ def process_grading(data: dict):
         )
 
         # Check if all questions are graded
-        if student_service.is_all_questions_graded(data["user_id"], data["exam_id"]):
-            student_exam_service.update_exam_status(data["user_id"], data["exam_id"], "completed")
+        if await _db(student_service.is_all_questions_graded, data["user_id"], data["exam_id"]):
+            await _db(student_exam_service.update_exam_status, data["user_id"], data["exam_id"], "completed")
         else:
-            student_exam_service.update_exam_status(data["user_id"], data["exam_id"], "pending")
-        
-        print(f"[Grading Thread] Finished for question_id {data['question_id']}")
+            await _db(student_exam_service.update_exam_status, data["user_id"], data["exam_id"], "pending")
+
+        print(f"[Grading Task] Finished for question_id {data['question_id']}")
 
         print(f"Active threads: {[t.name for t in threading.enumerate()]}")
 
     # except Exception as e:
     #     print("Error in background grading:", str(e))
+
+
+# Whole-exam job: one query for every answer still to grade, the module
+# resolved once, all answers embedded in one batch, graded concurrently
+# (several per prompt if the module enables answer_batching), and scores plus the exam status written in one transaction. Answers that
+# fail keep Feedback NULL, so the job's retry only grades those.
+async def process_exam_grading(data: dict):
+    with metrics.job("exam", exam_id=data["exam_id"]):
+        user_id, exam_id = data["user_id"], data["exam_id"]
+        rows = await _db(student_service.get_answers_to_grade, user_id, exam_id)
+        if not rows:
+            print(f"[Grading Task] Nothing left to grade for user {user_id}, exam {exam_id}")
+            return
+
+        print(f"[Grading Task] Grading {len(rows)} answers for user {user_id}, exam {exam_id}")
+        graph = await _route(rows[0]["ModuleName"])
+        with metrics.stage("embed"):
+            await asyncio.to_thread(
+                batch_encoder.prime,
+                [row["StdAnswer"] or "" for row in rows] + [row["ModelAnswer"] or "" for row in rows]
+            )
+
+        results = await graph.ainvoke_many([
+            {
+                "question_id": row["QuestionId"],
+                "question": row["QuestionName"],
+                "student_answer": row["StdAnswer"] or "",
+                "model_answer": row["ModelAnswer"],
+                "reference_ids": question_context.resolve(graph.config, row["QuestionName"], row["ModelAnswer"], row)
+            }
+            for row in rows
+        ])
+
+        grades = []
+        failures = []
+        for row, result in zip(rows, results):
+            if isinstance(result, Exception) or result.get("score") is None:
+                failures.append((row["QuestionId"], result))
+                continue
+            grades.append({
+                "question_id": row["QuestionId"],
+                "score": (result["score"] / 10) * row["QuestionMark"],
+                "feedback": result["feedback"]
+            })
+
+        metrics.annotate(answers=len(rows), graded=len(grades), failed=len(failures))
+        complete = not failures and rows[0]["FinalizedAnswers"] == rows[0]["TotalQuestions"]
+        await _db(
+            student_service.save_exam_grades, user_id, exam_id, grades, "completed" if complete else "pending"
+        )
+        print(f"[Grading Task] Saved {len(grades)} grades for user {user_id}, exam {exam_id}")
+
+        if failures:
+            raise RuntimeError(f"{len(failures)} answers failed to grade: {failures}")
+
+
+# Per-question job: all pending answers to one question, graded one after
+# another against the same references, so with the prefix prompt layout
+# every prompt after the first only makes Ollama evaluate the student
+# answer. Grades and exam statuses are saved in one transaction; failed
+# answers keep Feedback NULL for the job's retry.
+async def process_question_grading(data: dict):
+    with metrics.job("question", exam_id=data["exam_id"], question_id=data["question_id"]):
+        exam_id, question_id = data["exam_id"], data["question_id"]
+        rows = await _db(student_service.get_question_answers_to_grade, exam_id, question_id)
+        if not rows:
+            print(f"[Grading Task] Nothing left to grade for question {question_id}, exam {exam_id}")
+            return
+
+        print(f"[Grading Task] Grading {len(rows)} answers to question {question_id}, exam {exam_id}")
+        first = rows[0]
+        graph = await _route(first["ModuleName"])
+        reference_ids = question_context.resolve(graph.config, first["QuestionName"], first["ModelAnswer"], first)
+        metrics.annotate(precomputed_context=reference_ids is not None)
+        if reference_ids is None:
+            with metrics.stage("context_compute"):
+                context = await asyncio.to_thread(
+                    question_context.compute, graph.config, question_id, first["QuestionName"], first["ModelAnswer"]
+                )
+            reference_ids = context["reference_ids"]
+
+        grades = []
+        failures = []
+        for row in rows:
+            try:
+                result = await graph.ainvoke({
+                    "question": row["QuestionName"],
+                    "student_answer": row["StdAnswer"] or "",
+                    "model_answer": row["ModelAnswer"],
+                    "reference_ids": reference_ids
+                })
+            except Exception as e:
+                failures.append((row["UserId"], e))
+                continue
+            if result.get("score") is None:
+                failures.append((row["UserId"], result))
+                continue
+            grades.append({
+                "user_id": row["UserId"],
+                "score": (result["score"] / 10) * row["QuestionMark"],
+                "feedback": result["feedback"]
+            })
+
+        metrics.annotate(answers=len(rows), graded=len(grades), failed=len(failures))
+        await _db(student_service.save_question_grades, exam_id, question_id, grades)
+        print(f"[Grading Task] Saved {len(grades)} grades for question {question_id}, exam {exam_id}")
+
+        if failures:
+            raise RuntimeError(f"{len(failures)} answers failed to grade: {failures}")
+
+
+# Precompute retrieval context for new or replaced questions (queued by
+# db/services/lecturer_exam_service.py): embed question + model answer,
+# keep the top-k reference rows and the model answer embedding.
+async def process_question_context(data: dict):
+    with metrics.job("question_context"):
+        questions = await _db(question_context_service.get_questions, data["question_ids"])
+        contexts = []
+        for question in questions:
+            graph = await _route(question["ModuleName"])
+            with metrics.stage("context_compute"):
+                contexts.append(await asyncio.to_thread(
+                    question_context.compute, graph.config, question["QuestionId"],
+                    question["QuestionName"], question["ModelAnswer"]
+                ))
+        await _db(question_context_service.save_contexts, contexts)
+        print(f"[Grading Task] Precomputed context for {len(contexts)} questions")
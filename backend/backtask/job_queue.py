@@ -0,0 +1,235 @@
+# backtask/job_queue.py
+#
+# Consumer side of the durable grading queue (db/services/grading_job_service.py).
+# A pool of GRADING_WORKERS asyncio consumers runs on the event loop: each
+# claims one job at a time under a lease, grades it with process_grading,
+# renews the lease while the job runs, and completes or fails the row.
+# Failures are retried with exponential backoff; after GRADING_MAX_ATTEMPTS
+# the job is dead-lettered. Consumers only sleep when a claim comes back
+# empty, so a backlog left by an outage drains at full speed. Every run
+# leaves a row in gradingtrace (db/services/grading_trace_service.py), and
+# done jobs are purged after GRADING_JOB_RETENTION_HOURS.
+
+import os
+import time
+import socket
+import asyncio
+import traceback
+from collections import deque
+
+from db.services import grading_job_service, grading_trace_service, question_context_service
+from backtask.bgtask import process_grading, process_exam_grading, process_question_grading, process_question_context
+from grader import metrics
+
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", 4))
+GRADING_LEASE_SECONDS = float(os.getenv("GRADING_LEASE_SECONDS", 120))
+GRADING_POLL_SECONDS = float(os.getenv("GRADING_POLL_SECONDS", 1.0))
+GRADING_MAX_ATTEMPTS = int(os.getenv("GRADING_MAX_ATTEMPTS", 5))
+GRADING_RETRY_BASE_SECONDS = float(os.getenv("GRADING_RETRY_BASE_SECONDS", 5))
+GRADING_RETRY_MAX_SECONDS = float(os.getenv("GRADING_RETRY_MAX_SECONDS", 600))
+# Consecutive claims a consumer may make for the model it graded last
+# before it takes the oldest job of any model, so one module's backlog
+# can't starve the others
+GRADING_AFFINITY_MAX_CLAIMS = int(os.getenv("GRADING_AFFINITY_MAX_CLAIMS", 8))
+# Done jobs older than this are deleted (0 keeps them); dead jobs are kept
+GRADING_JOB_RETENTION_HOURS = float(os.getenv("GRADING_JOB_RETENTION_HOURS", 72))
+GRADING_PURGE_INTERVAL_SECONDS = float(os.getenv("GRADING_PURGE_INTERVAL_SECONDS", 3600))
+# "question": one job per finalized answer
+# "exam": one job per student exam (backtask.bgtask.process_exam_grading),
+#         started GRADING_EXAM_DELAY_SECONDS after the first finalized answer
+#         so the rest of the submission lands first
+# "question_group": one job per exam question (process_question_grading),
+#         started GRADING_QUESTION_DELAY_SECONDS after the first finalized
+#         answer; grades every pending answer to it back-to-back
+GRADING_BATCH_MODE = os.getenv("GRADING_BATCH_MODE", "question")
+GRADING_EXAM_DELAY_SECONDS = float(os.getenv("GRADING_EXAM_DELAY_SECONDS", 5))
+GRADING_QUESTION_DELAY_SECONDS = float(os.getenv("GRADING_QUESTION_DELAY_SECONDS", 30))
+
+JOB_HANDLERS = {
+    "answer": process_grading,
+    "exam": process_exam_grading,
+    "question": process_question_grading,
+    "question_context": process_question_context,
+}
+
+
+def retry_delay(attempts: int) -> float:
+    return min(GRADING_RETRY_BASE_SECONDS * 2 ** (attempts - 1), GRADING_RETRY_MAX_SECONDS)
+
+
+def enqueue_answer(data: dict, module_name: str = None, model: str = None) -> int:
+    return grading_job_service.enqueue_job("answer", data, module_name, model, GRADING_MAX_ATTEMPTS)
+
+
+def enqueue_exam(user_id: int, exam_id: int, module_name: str = None, model: str = None):
+    """Queue a whole-exam job unless one for this student exam is already waiting."""
+    return grading_job_service.enqueue_job(
+        "exam", {"user_id": user_id, "exam_id": exam_id}, module_name, model, GRADING_MAX_ATTEMPTS,
+        delay_seconds=GRADING_EXAM_DELAY_SECONDS, dedupe_key=f"exam:{user_id}:{exam_id}"
+    )
+
+
+def enqueue_question(exam_id: int, question_id: int, module_name: str = None, model: str = None):
+    """Queue a per-question job unless one for this question is already waiting."""
+    return grading_job_service.enqueue_job(
+        "question", {"exam_id": exam_id, "question_id": question_id}, module_name, model, GRADING_MAX_ATTEMPTS,
+        delay_seconds=GRADING_QUESTION_DELAY_SECONDS, dedupe_key=f"question:{exam_id}:{question_id}"
+    )
+
+
+class GradingWorkerPool:
+    def __init__(self, workers: int = GRADING_WORKERS, name: str = None, modules: list = None):
+        self.workers = workers
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.modules = modules
+        self._tasks = []
+        self._stopping = asyncio.Event()
+        self.completed = 0
+        self.failed = 0
+        self.dead = 0
+        self._finished_at = deque(maxlen=1000)
+
+    async def start(self):
+        await asyncio.to_thread(grading_job_service.ensure_table)
+        await asyncio.to_thread(grading_trace_service.ensure_table)
+        await asyncio.to_thread(question_context_service.ensure_table)
+        self._tasks = [
+            asyncio.create_task(self._consume(f"{self.name}-{i}"), name=f"grading-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if GRADING_JOB_RETENTION_HOURS > 0:
+            self._tasks.append(asyncio.create_task(self._purge(), name="grading-job-purge"))
+        print(f"[INFO] Started {self.workers} grading workers ({self.name}) for {self.modules or 'all modules'}")
+
+    async def stop(self, timeout: float = 30):
+        """Stop claiming; wait up to `timeout` for running jobs, then cancel
+        them (their leases expire and another worker picks them up)."""
+        self._stopping.set()
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        print(f"[INFO] Stopped grading workers ({self.name}): {len(done)} finished, {len(pending)} cancelled")
+
+    async def _consume(self, worker_id: str):
+        last_model = None
+        streak = 0
+        while not self._stopping.is_set():
+            # Prefer the model this worker graded last (see grader/scheduler.py),
+            # but only GRADING_AFFINITY_MAX_CLAIMS times in a row
+            prefer_model = last_model if streak < GRADING_AFFINITY_MAX_CLAIMS else None
+            try:
+                jobs = await asyncio.to_thread(
+                    grading_job_service.claim_jobs, worker_id, 1, GRADING_LEASE_SECONDS, prefer_model, self.modules
+                )
+            except Exception as e:
+                print(f"[WARN] {worker_id} could not claim jobs: {e}")
+                jobs = []
+
+            for job in jobs:
+                await self._run(worker_id, job)
+                streak = streak + 1 if prefer_model and job["Model"] == prefer_model else 0
+                last_model = job["Model"] or last_model
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), GRADING_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _run(self, worker_id: str, job: dict):
+        job_id = job["JobId"]
+        heartbeat = asyncio.create_task(self._renew_lease(worker_id, job_id))
+        trace = None
+        try:
+            with metrics.job(job["Kind"], job_id=job_id, attempt=job["Attempts"], worker=worker_id) as trace:
+                await JOB_HANDLERS[job["Kind"]](job["Payload"])
+        except Exception as e:
+            traceback.print_exc()
+            status = await asyncio.to_thread(
+                grading_job_service.fail_job, job_id, worker_id, f"{type(e).__name__}: {e}", retry_delay(job["Attempts"])
+            )
+            self.failed += 1
+            if status == "dead":
+                self.dead += 1
+                print(f"[ERROR] Grading job {job_id} dead-lettered after {job['Attempts']} attempts: {e}")
+            await self._record_trace(trace, "dead" if status == "dead" else "retry", job_id)
+            return
+        finally:
+            heartbeat.cancel()
+
+        await asyncio.to_thread(grading_job_service.complete_job, job_id, worker_id)
+        self.completed += 1
+        self._finished_at.append(time.time())
+        await self._record_trace(trace, "done", job_id)
+
+    async def _record_trace(self, trace: dict, status: str, job_id: int):
+        if trace is None:
+            return
+        try:
+            await asyncio.to_thread(grading_trace_service.record_trace, trace, status, job_id)
+        except Exception as e:
+            print(f"[WARN] Could not record trace for grading job {job_id}: {e}")
+
+    async def _renew_lease(self, worker_id: str, job_id: int):
+        # Renewing every third of the lease leaves room for a failed attempt
+        # or two; only losing the lease to another worker ends the heartbeat
+        while True:
+            await asyncio.sleep(GRADING_LEASE_SECONDS / 3)
+            try:
+                owned = await asyncio.to_thread(grading_job_service.extend_lease, job_id, worker_id, GRADING_LEASE_SECONDS)
+            except Exception as e:
+                print(f"[WARN] Could not renew lease on grading job {job_id}: {e}")
+                continue
+            if not owned:
+                print(f"[WARN] {worker_id} lost the lease on grading job {job_id}")
+                return
+
+    async def _purge(self):
+        while not self._stopping.is_set():
+            try:
+                purged = await asyncio.to_thread(grading_job_service.purge_finished_jobs, GRADING_JOB_RETENTION_HOURS)
+                if purged:
+                    print(f"[INFO] Purged {purged} grading jobs finished over {GRADING_JOB_RETENTION_HOURS:g}h ago")
+            except Exception as e:
+                print(f"[WARN] Could not purge finished grading jobs: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), GRADING_PURGE_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        cutoff = time.time() - 60
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "modules": self.modules,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dead": self.dead,
+            "completed_last_minute": sum(1 for t in self._finished_at if t >= cutoff),
+        }
+
+
+worker_pool = None
+
+
+async def start_workers(workers: int = GRADING_WORKERS):
+    global worker_pool
+    if workers <= 0:
+        return
+    worker_pool = GradingWorkerPool(workers)
+    await worker_pool.start()
+
+
+async def stop_workers():
+    if worker_pool is not None:
+        await worker_pool.stop()
+
+
+def stats() -> dict:
+    report = grading_job_service.get_queue_stats()
+    report["local_workers"] = worker_pool.stats() if worker_pool else None
+    return report
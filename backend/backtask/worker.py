@@ -0,0 +1,187 @@
+# backtask/worker.py
+#
+# Standalone grading worker: runs N processes that consume the durable
+# grading queue (backtask/job_queue.py), so embedding/retrieval work gets
+# its own cores instead of sharing the API process's GIL.
+#
+#   python -m backtask.worker                                  # one process per core, any module
+#   python -m backtask.worker --processes "Database Module=2" --processes "*=2"
+#
+# Each process pins torch/faiss/BLAS to --threads threads, loads the
+# embedding model and its modules' graders once at start, and runs
+# --concurrency asyncio consumers. SIGTERM/SIGINT stop claiming new jobs
+# and wait up to GRADING_SHUTDOWN_SECONDS for running ones; unfinished
+# jobs are picked up again when their lease expires. The parent restarts
+# processes that die, with exponential backoff for ones that keep dying
+# soon after start (e.g. on import).
+#
+# Ollama limits (OLLAMA_HOST_CONCURRENCY, OLLAMA_MODEL_CONCURRENCY) and the
+# model-affinity scheduler (grader/scheduler.py) are per process: size the
+# limits for the process count, and leave OLLAMA_SOLE_CLIENT unset so one
+# process never unloads a model the others are still using.
+#
+# With GRADING_METRICS_PORT set (docker-compose sets 9100), process i
+# serves its stage histograms at :GRADING_METRICS_PORT+i/metrics; scrape
+# one target per process. Unset, workers expose no metrics.
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import argparse
+import multiprocessing
+
+GRADING_WORKER_PROCESSES = os.getenv("GRADING_WORKER_PROCESSES", "")
+GRADING_SHUTDOWN_SECONDS = float(os.getenv("GRADING_SHUTDOWN_SECONDS", 60))
+GRADING_METRICS_PORT = int(os.getenv("GRADING_METRICS_PORT", 0))
+GRADING_RESTART_BASE_SECONDS = float(os.getenv("GRADING_RESTART_BASE_SECONDS", 1))
+GRADING_RESTART_MAX_SECONDS = float(os.getenv("GRADING_RESTART_MAX_SECONDS", 300))
+# A process that ran at least this long before dying is restarted at once
+GRADING_RESTART_STABLE_SECONDS = float(os.getenv("GRADING_RESTART_STABLE_SECONDS", 60))
+ANY_MODULE = "*"
+
+
+def parse_processes(specs: list) -> list:
+    """["Database Module=2", "*=3"] -> [(["Database Module"], 2), (None, 3)]"""
+    plan = []
+    for spec in specs:
+        name, _, count = spec.rpartition("=")
+        if not name or not count.isdigit():
+            raise ValueError(f"Expected '<module>=<processes>', got '{spec}'")
+        plan.append((None if name.strip() == ANY_MODULE else [name.strip()], int(count)))
+    return plan
+
+
+def restart_delay(failures: int) -> float:
+    """Seconds to wait before restarting a process that died `failures`
+    times in a row within GRADING_RESTART_STABLE_SECONDS of starting."""
+    if failures <= 0:
+        return 0.0
+    return min(GRADING_RESTART_BASE_SECONDS * 2 ** (failures - 1), GRADING_RESTART_MAX_SECONDS)
+
+
+def _pin_threads(threads: int):
+    # Must run before torch/faiss/numpy are imported in this process
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+
+async def _serve(name: str, modules: list, concurrency: int, threads: int, metrics_port: int):
+    import torch
+    import faiss
+    torch.set_num_threads(threads)
+    faiss.omp_set_num_threads(threads)
+
+    from grader import registry
+    from grader.embeddings import embedding_service
+    from grader.model_router import route_model
+    from backtask.job_queue import GradingWorkerPool
+    from grader import metrics
+
+    if metrics_port:
+        metrics.serve(metrics_port)
+    start = time.perf_counter()
+    embedding_service.model
+    for module_name in modules or registry.module_names():
+        route_model(module_name)
+    print(f"[INFO] {name}: grader resources loaded in {time.perf_counter() - start:.2f}s ({threads} threads)")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    pool = GradingWorkerPool(concurrency, name, modules)
+    await pool.start()
+    await stopping.wait()
+    await pool.stop(GRADING_SHUTDOWN_SECONDS)
+
+
+def _run_process(name: str, modules: list, concurrency: int, threads: int, metrics_port: int):
+    _pin_threads(threads)
+    asyncio.run(_serve(name, modules, concurrency, threads, metrics_port))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run grading worker processes")
+    parser.add_argument("--processes", action="append", default=[],
+                        help="'<module>=<count>' or '*=<count>'; repeatable (default: one per core for any module)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("GRADING_WORKERS", 4)),
+                        help="concurrent jobs per process")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("GRADER_TORCH_THREADS", 0)),
+                        help="torch/faiss threads per process (default: cores / processes)")
+    args = parser.parse_args(argv)
+
+    specs = args.processes or [spec.strip() for spec in GRADING_WORKER_PROCESSES.split(",") if spec.strip()]
+    plan = parse_processes(specs or [f"{ANY_MODULE}={os.cpu_count() or 1}"])
+
+    from grader import registry
+    for modules, _ in plan:
+        for module_name in modules or ():
+            registry.get_module_config(module_name)
+
+    total = sum(count for _, count in plan)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // total)
+
+    context = multiprocessing.get_context("spawn")
+    hostname = os.uname().nodename
+    slots = [
+        (f"{hostname}-{(modules or [ANY_MODULE])[0].replace(' ', '_')}-{i}", modules)
+        for modules, count in plan for i in range(count)
+    ]
+    metrics_ports = {name: GRADING_METRICS_PORT + i if GRADING_METRICS_PORT else 0 for i, (name, _) in enumerate(slots)}
+    processes = {}
+    restarts = {}
+
+    def spawn(name, modules):
+        process = context.Process(
+            target=_run_process, args=(name, modules, args.concurrency, threads, metrics_ports[name]), name=name
+        )
+        process.start()
+        processes[name] = (process, modules, time.time())
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for name, modules in slots:
+        spawn(name, modules)
+    print(f"[INFO] Started {total} grading processes x {args.concurrency} jobs, {threads} threads each")
+
+    while not stopping:
+        time.sleep(1)
+        now = time.time()
+        for name, (process, modules, started) in list(processes.items()):
+            if process.is_alive() or stopping:
+                continue
+            restart = restarts.setdefault(name, {"failures": 0, "at": None})
+            if restart["at"] is None:
+                restart["failures"] = 0 if now - started >= GRADING_RESTART_STABLE_SECONDS else restart["failures"] + 1
+                delay = restart_delay(restart["failures"])
+                restart["at"] = now + delay
+                print(f"[WARN] Grading process {name} exited with {process.exitcode}; restarting in {delay:.0f}s")
+            if now >= restart["at"]:
+                restart["at"] = None
+                spawn(name, modules)
+
+    print("[INFO] Stopping grading processes...")
+    for process, _, _ in processes.values():
+        if process.is_alive():
+            process.terminate()
+    deadline = time.time() + GRADING_SHUTDOWN_SECONDS + 5
+    for process, _, _ in processes.values():
+        process.join(max(0, deadline - time.time()))
+        if process.is_alive():
+            process.kill()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# benchmarks/fake_ollama.py
+#
+# Local stand-in for Ollama's streaming /api/generate endpoint, so grading
+# throughput can be measured without a GPU or network:
+#
+#   python -m benchmarks.fake_ollama --port 11435 --latency-ms 200 --tokens-per-second 40
+#
+# Each request waits for a simulated prompt evaluation (latency plus the
+# prompt tokens not shared with the previous prompt for that model, like
+# Ollama's KV-cache prefix reuse), then streams the reply at the given
+# token rate. The reply follows the request: a JSON object or array when a
+# "format" schema is sent, "Score:/Feedback:" lines otherwise, and a
+# malformed reply with probability --malformed-rate. Counters per model
+# are kept for the benchmark report.
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+QUESTION_ID_PATTERN = re.compile(r"\[question_id: ([^\]]+)\]")
+FEEDBACK = "The answer covers the main idea but misses some detail from the reference and could be more precise"
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _common_prefix(a: str, b: str) -> int:
+    size = min(len(a), len(b))
+    i = 0
+    while i < size and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class FakeOllama:
+    def __init__(self, latency_ms: float = 200, tokens_per_second: float = 40, prompt_tokens_per_second: float = 0,
+                 output_format: str = "auto", malformed_rate: float = 0.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.output_format = output_format
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._last_prompt = {}
+        self._stats = defaultdict(lambda: {
+            "requests": 0, "completed": 0, "closed_early": 0, "prompt_tokens": 0, "prompt_tokens_evaluated": 0,
+            "prompt_eval_seconds": 0.0, "generated_tokens": 0, "max_concurrency": 0, "running": 0
+        })
+        self._server = None
+
+    # --- replies ---
+
+    def _reply(self, body: dict) -> str:
+        with self._lock:
+            malformed = self._random.random() < self.malformed_rate
+            score = self._random.randint(3, 9)
+        fmt = body.get("format")
+        mode = self.output_format
+        if mode == "auto":
+            mode = "json" if fmt else "text"
+
+        if mode == "text":
+            reply = f"Score: {score}\nFeedback: {FEEDBACK}.\n"
+            return reply.replace("Score", "Grade") if malformed else reply
+
+        if isinstance(fmt, dict) and fmt.get("type") == "array":
+            ids = QUESTION_ID_PATTERN.findall(body["prompt"])
+            entries = [{"question_id": int(i) if i.isdigit() else i, "score": score, "feedback": FEEDBACK} for i in ids]
+            reply = json.dumps(entries)
+        else:
+            reply = json.dumps({"score": score, "feedback": FEEDBACK})
+        return reply[:len(reply) // 2] if malformed else reply
+
+    def _prompt_tokens(self, model: str, prompt: str):
+        with self._lock:
+            cached = _common_prefix(self._last_prompt.get(model, ""), prompt)
+            self._last_prompt[model] = prompt
+        return estimate_tokens(prompt), estimate_tokens(prompt[cached:]) if cached < len(prompt) else 0
+
+    # --- server ---
+
+    def handle(self, handler: BaseHTTPRequestHandler, body: dict):
+        model = body.get("model", "")
+        stats = self._stats[model]
+        with self._lock:
+            stats["requests"] += 1
+            stats["running"] += 1
+            stats["max_concurrency"] = max(stats["max_concurrency"], stats["running"])
+
+        try:
+            prompt_tokens, evaluated = self._prompt_tokens(model, body.get("prompt", ""))
+            prompt_eval = self.latency
+            if self.prompt_tokens_per_second:
+                prompt_eval += evaluated / self.prompt_tokens_per_second
+            time.sleep(prompt_eval)
+
+            limit = (body.get("options") or {}).get("num_predict") or 0
+            tokens = re.findall(r"\S+\s*|\s+", self._reply(body))
+            if limit > 0:
+                tokens = tokens[:limit]
+
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/x-ndjson")
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.end_headers()
+
+            sent = 0
+            for token in tokens:
+                if self.tokens_per_second:
+                    time.sleep(1 / self.tokens_per_second)
+                self._write(handler, {"model": model, "response": token, "done": False})
+                sent += 1
+            self._write(handler, {
+                "model": model, "response": "", "done": True,
+                "prompt_eval_count": evaluated, "prompt_eval_duration": int(prompt_eval * 1e9),
+                "eval_count": sent, "eval_duration": int(sent / self.tokens_per_second * 1e9) if self.tokens_per_second else 0,
+            })
+            handler.wfile.write(b"0\r\n\r\n")
+            handler.wfile.flush()
+            completed = True
+        except (BrokenPipeError, ConnectionResetError):
+            completed = False
+            sent = 0
+
+        with self._lock:
+            stats["running"] -= 1
+            stats["completed" if completed else "closed_early"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["prompt_tokens_evaluated"] += evaluated
+            stats["prompt_eval_seconds"] += prompt_eval
+            stats["generated_tokens"] += sent
+
+    @staticmethod
+    def _write(handler, message: dict):
+        line = (json.dumps(message) + "\n").encode("utf-8")
+        handler.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        handler.wfile.flush()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                fake.handle(self, body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._last_prompt.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {model: {k: v for k, v in stats.items() if k != "running"} for model, stats in self._stats.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=200, help="time before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40, help="generation rate (0 = instant)")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=0,
+                        help="prompt evaluation rate for tokens not in the cached prefix (0 = free)")
+    parser.add_argument("--format", dest="output_format", choices=("auto", "json", "text"), default="auto")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    fake = FakeOllama(args.latency_ms, args.tokens_per_second, args.prompt_tokens_per_second,
+                      args.output_format, args.malformed_rate)
+    url = fake.start(args.host, args.port)
+    print(f"[INFO] Fake Ollama listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# benchmarks/grading_bench.py
+#
+# Offline grading throughput benchmark. Starts benchmarks/fake_ollama.py on
+# a free local port, points the grader at it and runs a batch of jobs per
+# module, either through backtask.bgtask.process_grading (MySQL calls
+# served from memory) or straight through the module's graph:
+#
+#   python -m benchmarks.grading_bench --jobs 200 --concurrency 16
+#   python -m benchmarks.grading_bench --target graph --modules "Database Module" --latency-ms 500
+#   python -m benchmarks.grading_bench --layout both --order question --concurrency 1 --prompt-tokens-per-second 500
+#
+# Reports jobs/s, p50/p95/p99 job latency and LLM calls per job for each
+# module, plus prompt-eval time per call: the fake server only charges for
+# prompt tokens past the prefix shared with the model's previous prompt,
+# so --layout both shows the legacy and prefix prompt layouts side by side
+# (--order question grades each question's answers back-to-back). Needs
+# the FAISS indexes and a locally cached embedding model, but no network,
+# Ollama or MySQL.
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from benchmarks.fake_ollama import FakeOllama
+
+TARGETS = ("job", "graph")
+LAYOUTS = ("module", "legacy", "prefix", "both")
+ORDERS = ("interleaved", "question")
+
+
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 1)
+
+
+def load_questions(config: dict) -> list:
+    with open(config["corpus_path"], "r", encoding="utf-8") as f:
+        return [
+            {"question_id": i, "question": q["Question"], "model_answer": q["Model Answer"]}
+            for i, q in enumerate(json.load(f), 1)
+        ]
+
+
+def make_workload(questions: list, jobs: int, seed: int, order: str = "interleaved", tag: str = "") -> list:
+    """Partial paraphrases of the model answers, made unique per job so the
+    grade cache and prescore fast paths don't hide the LLM. "interleaved"
+    cycles through the questions, "question" groups each question's answers."""
+    rng = random.Random(seed)
+    workload = []
+    for i in range(jobs):
+        question = questions[i % len(questions)]
+        words = question["model_answer"].split()
+        kept = words[:max(1, int(len(words) * rng.uniform(0.3, 0.8)))]
+        workload.append({**question, "student_answer": f"{' '.join(kept)} (answer {tag}{i})"})
+    if order == "question":
+        workload.sort(key=lambda item: item["question_id"])
+    return workload
+
+
+class InMemoryExamStore:
+    """Serves the student_service/student_exam_service calls made by
+    process_grading from memory, with an optional per-call delay."""
+
+    def __init__(self, module_name: str, questions: list, latency_ms: float = 0):
+        self.module_name = module_name
+        self.questions = {q["question_id"]: q for q in questions}
+        self.latency = latency_ms / 1000
+        self.answers = {}
+        self.calls = 0
+
+    def _round_trip(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_question_with_model_answer(self, question_id):
+        self._round_trip()
+        question = self.questions.get(question_id)
+        return {"QuestionName": question["question"], "ModelAnswer": question["model_answer"]} if question else None
+
+    def get_module_name_by_exam_id(self, exam_id):
+        self._round_trip()
+        return self.module_name
+
+    def update_student_answer(self, user_id, exam_id, question_id, answer, is_finalized, score, feedback):
+        self._round_trip()
+        self.answers[(user_id, exam_id, question_id)] = (score, feedback)
+
+    def is_all_questions_graded(self, user_id, exam_id):
+        self._round_trip()
+        return False
+
+    def update_exam_status(self, user_id, exam_id, new_status):
+        self._round_trip()
+
+    def install(self):
+        from db.services import student_service, student_exam_service
+        patched = []
+        for module, names in (
+            (student_service, ("get_question_with_model_answer", "get_module_name_by_exam_id",
+                               "update_student_answer", "is_all_questions_graded")),
+            (student_exam_service, ("update_exam_status",)),
+        ):
+            for name in names:
+                patched.append((module, name, getattr(module, name)))
+                setattr(module, name, getattr(self, name))
+
+        def restore():
+            for module, name, original in patched:
+                setattr(module, name, original)
+        return restore
+
+
+async def _run_jobs(run_one, workload: list, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async def timed(i, item):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await run_one(i, item)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i, item) for i, item in enumerate(workload)))
+    return time.perf_counter() - start, latencies, errors
+
+
+async def bench_module(fake: FakeOllama, module_name: str, args, layout: str = "module") -> dict:
+    from grader import registry
+    from grader.model_router import route_model
+
+    config = registry.get_module_config(module_name)
+    if layout != "module" and config["prompt_layout"] != layout:
+        config = registry.register_module({**config, "prompt_layout": layout}, persist=False)
+    questions = load_questions(config)
+    workload = make_workload(questions, args.jobs, args.seed, args.order, config["prompt_layout"])
+
+    load_start = time.perf_counter()
+    graph = await asyncio.to_thread(route_model, module_name)
+    load_seconds = time.perf_counter() - load_start
+
+    restore = None
+    store = None
+    if args.target == "job":
+        from backtask.bgtask import process_grading
+        store = InMemoryExamStore(module_name, questions, args.db_latency_ms)
+        restore = store.install()
+
+        async def run_one(i, item):
+            await process_grading({
+                "user_id": i, "exam_id": 1, "question_id": item["question_id"],
+                "studentAnswer": item["student_answer"], "is_finalized": True, "question_mark": 10
+            })
+    else:
+        async def run_one(i, item):
+            result = await graph.ainvoke({
+                "question": item["question"],
+                "student_answer": item["student_answer"],
+                "model_answer": item["model_answer"]
+            })
+            if result.get("score") is None:
+                raise ValueError("no score")
+
+    fake.reset()
+    try:
+        wall, latencies, errors = await _run_jobs(run_one, workload, args.concurrency)
+    finally:
+        if restore:
+            restore()
+
+    server = fake.stats().get(config["llm"]["model"], {})
+    done = len(latencies)
+    return {
+        "module": module_name,
+        "model": config["llm"]["model"],
+        "target": args.target,
+        "layout": config["prompt_layout"],
+        "jobs": len(workload),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "load_seconds": round(load_seconds, 2),
+        "wall_seconds": round(wall, 2),
+        "jobs_per_second": round(done / wall, 2) if wall else None,
+        "latency_ms_p50": percentile(latencies, 0.50),
+        "latency_ms_p95": percentile(latencies, 0.95),
+        "latency_ms_p99": percentile(latencies, 0.99),
+        "llm_calls_per_job": round(server.get("requests", 0) / len(workload), 2),
+        "streams_closed_early": server.get("closed_early", 0),
+        "generated_tokens_per_job": round(server.get("generated_tokens", 0) / len(workload), 1),
+        "prompt_eval_ms_per_call": (
+            round(server["prompt_eval_seconds"] / server["requests"] * 1000, 1) if server.get("requests") else None
+        ),
+        "prompt_tokens_evaluated_per_call": (
+            round(server["prompt_tokens_evaluated"] / server["requests"], 1) if server.get("requests") else None
+        ),
+        "max_ollama_concurrency": server.get("max_concurrency", 0),
+        "db_calls_per_job": round(store.calls / len(workload), 2) if store else None,
+    }
+
+
+def print_table(rows: list):
+    columns = [
+        ("module", "module", 22), ("target", "target", 6), ("layout", "layout", 6), ("jobs", "jobs", 5), ("errors", "err", 4),
+        ("jobs_per_second", "jobs/s", 8), ("latency_ms_p50", "p50 ms", 9), ("latency_ms_p95", "p95 ms", 9),
+        ("latency_ms_p99", "p99 ms", 9), ("llm_calls_per_job", "llm/job", 8), ("prompt_eval_ms_per_call", "eval ms", 8),
+    ]
+    print(" ".join(f"{title:>{width}}" if i else f"{title:<{width}}" for i, (_, title, width) in enumerate(columns)))
+    for row in rows:
+        print(" ".join(
+            f"{str(row[key]):>{width}}" if i else f"{str(row[key])[:width]:<{width}}"
+            for i, (key, _, width) in enumerate(columns)
+        ))
+    for row in rows:
+        if row["first_error"]:
+            print(f"[WARN] {row['module']}: {row['errors']} failed jobs, first: {row['first_error']}")
+
+
+async def run(args) -> list:
+    fake = FakeOllama(args.latency_ms, args.tokens_per_second, args.prompt_tokens_per_second,
+                      args.output_format, args.malformed_rate, args.seed)
+    url = fake.start()
+    # Must be set before grader.llm is imported
+    os.environ["LLM_BASE_URL"] = url
+
+    from grader import registry
+    for config in registry.all_modules():
+        config["llm"].pop("base_url", None)
+
+    try:
+        layouts = ("legacy", "prefix") if args.layout == "both" else (args.layout,)
+        return [
+            await bench_module(fake, name, args, layout)
+            for name in (args.modules or registry.module_names())
+            for layout in layouts
+        ]
+    finally:
+        fake.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline grading throughput benchmark")
+    parser.add_argument("--modules", action="append", default=[], help="module name; repeatable (default: all)")
+    parser.add_argument("--target", choices=TARGETS, default="job",
+                        help="'job': process_grading with in-memory MySQL calls; 'graph': the module graph only")
+    parser.add_argument("--jobs", type=int, default=100, help="jobs per module")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200, help="fake Ollama time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40)
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=0)
+    parser.add_argument("--format", dest="output_format", choices=("auto", "json", "text"), default="auto")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--layout", choices=LAYOUTS, default="module",
+                        help="prompt layout to benchmark ('module': as configured; 'both': legacy then prefix)")
+    parser.add_argument("--order", choices=ORDERS, default="interleaved",
+                        help="submit jobs cycling through questions or grouped per question")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="delay per in-memory MySQL call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    rows = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(rows, indent=1))
+    else:
+        print_table(rows)
+    return 1 if any(row["errors"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
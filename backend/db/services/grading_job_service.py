@@ -0,0 +1,312 @@
+# db/services/grading_job_service.py
+#
+# Durable grading job queue in MySQL. A submitted answer becomes a row in
+# gradingjob; workers claim rows under a lease (SELECT ... FOR UPDATE SKIP
+# LOCKED, MySQL 8), so a job whose worker died is picked up again once its
+# lease expires. Failed jobs are retried with exponential backoff and end
+# up in the 'dead' state after MaxAttempts. Done jobs are purged after a
+# retention period (purge_finished_jobs).
+
+import json
+from db.mysql_connect import get_connection
+
+GRADING_JOB_TABLE = """
+    CREATE TABLE IF NOT EXISTS gradingjob (
+        JobId BIGINT AUTO_INCREMENT PRIMARY KEY,
+        Kind VARCHAR(32) NOT NULL DEFAULT 'answer',
+        Payload JSON NOT NULL,
+        ModuleName VARCHAR(255) NULL,
+        Model VARCHAR(128) NULL,
+        DedupeKey VARCHAR(128) NULL,
+        Status ENUM('queued', 'running', 'done', 'dead') NOT NULL DEFAULT 'queued',
+        Attempts INT NOT NULL DEFAULT 0,
+        MaxAttempts INT NOT NULL DEFAULT 5,
+        AvailableAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        LeaseOwner VARCHAR(128) NULL,
+        LeaseExpiresAt DATETIME(3) NULL,
+        LastError TEXT NULL,
+        CreatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        StartedAt DATETIME(3) NULL,
+        FinishedAt DATETIME(3) NULL,
+        INDEX idx_gradingjob_claim (Status, AvailableAt, JobId),
+        INDEX idx_gradingjob_model_claim (Status, Model, AvailableAt, JobId),
+        INDEX idx_gradingjob_lease (Status, LeaseExpiresAt),
+        INDEX idx_gradingjob_finished (Status, FinishedAt),
+        INDEX idx_gradingjob_dedupe (DedupeKey, Status)
+    )
+"""
+
+
+# Indexes added after the table was first shipped; CREATE TABLE IF NOT
+# EXISTS leaves existing tables without them
+ADDED_INDEXES = {
+    "idx_gradingjob_model_claim": "(Status, Model, AvailableAt, JobId)",
+}
+
+
+def ensure_table():
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(GRADING_JOB_TABLE)
+    for name, columns in ADDED_INDEXES.items():
+        cursor.execute("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'gradingjob' AND index_name = %s
+            LIMIT 1
+        """, (name,))
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE gradingjob ADD INDEX {name} {columns}")
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def enqueue_job(kind: str, payload: dict, module_name: str = None, model: str = None, max_attempts: int = 5,
+                delay_seconds: float = 0, dedupe_key: str = None):
+    """Insert a job; with a dedupe_key, skip it (and return None) while a job
+    with the same key is still queued."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    if dedupe_key:
+        # Serialize check-and-insert for concurrent submissions of one exam
+        cursor.execute("SELECT GET_LOCK(%s, 5)", (dedupe_key,))
+        cursor.fetchone()
+    cursor.execute("""
+        INSERT INTO gradingjob (Kind, Payload, ModuleName, Model, MaxAttempts, AvailableAt, DedupeKey)
+        SELECT %s, %s, %s, %s, %s, NOW(3) + INTERVAL %s MICROSECOND, %s
+        FROM DUAL
+        WHERE %s IS NULL OR NOT EXISTS (
+            SELECT 1 FROM gradingjob WHERE DedupeKey = %s AND Status = 'queued'
+        )
+    """, (kind, json.dumps(payload), module_name, model, max_attempts, int(delay_seconds * 1_000_000),
+          dedupe_key, dedupe_key, dedupe_key))
+    job_id = cursor.lastrowid if cursor.rowcount else None
+    conn.commit()
+    if dedupe_key:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (dedupe_key,))
+        cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return job_id
+
+
+def _lock_runnable(cursor, condition: str, params: tuple, order: str, limit: int, modules: list, claimed: list) -> list:
+    filters = ""
+    if modules:
+        filters += f" AND ModuleName IN ({', '.join(['%s'] * len(modules))})"
+    if claimed:
+        filters += f" AND JobId NOT IN ({', '.join(['%s'] * len(claimed))})"
+    cursor.execute(f"""
+        SELECT JobId, Kind, Payload, ModuleName, Model, Attempts, MaxAttempts
+        FROM gradingjob
+        WHERE {condition}{filters}
+        ORDER BY {order}
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    """, (*params, *(modules or ()), *claimed, limit))
+    return cursor.fetchall()
+
+
+def claim_jobs(worker_id: str, limit: int, lease_seconds: float, prefer_model: str = None, modules: list = None) -> list:
+    """Lease up to `limit` runnable jobs, optionally only for `modules`:
+    running jobs whose lease expired, then due jobs for `prefer_model`, then
+    any due job, oldest first. Each step is its own index-ordered scan that
+    stops at LIMIT, so concurrent claimers only lock the rows they take.
+
+    A job whose lease expired on its last attempt most likely killed its
+    worker (OOM, segfault); it is dead-lettered here instead of reclaimed,
+    since fail_job never ran for it."""
+    steps = [("Status = 'running' AND LeaseExpiresAt < NOW(3) AND Attempts < MaxAttempts", (), "LeaseExpiresAt, JobId")]
+    if prefer_model:
+        steps.append(("Status = 'queued' AND Model = %s AND AvailableAt <= NOW(3)", (prefer_model,), "AvailableAt, JobId"))
+    steps.append(("Status = 'queued' AND AvailableAt <= NOW(3)", (), "AvailableAt, JobId"))
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    jobs = []
+    try:
+        exhausted = _lock_runnable(
+            cursor, "Status = 'running' AND LeaseExpiresAt < NOW(3) AND Attempts >= MaxAttempts", (),
+            "LeaseExpiresAt, JobId", limit, modules, []
+        )
+        if exhausted:
+            ids = [job["JobId"] for job in exhausted]
+            cursor.execute(f"""
+                UPDATE gradingjob
+                SET Status = 'dead', FinishedAt = NOW(3),
+                    LastError = CONCAT('Lease expired on the final attempt (worker ', COALESCE(LeaseOwner, '?'),
+                                       ' stopped without reporting)'),
+                    LeaseOwner = NULL, LeaseExpiresAt = NULL
+                WHERE JobId IN ({', '.join(['%s'] * len(ids))})
+            """, tuple(ids))
+
+        for condition, params, order in steps:
+            if len(jobs) >= limit:
+                break
+            jobs += _lock_runnable(
+                cursor, condition, params, order, limit - len(jobs), modules, [job["JobId"] for job in jobs]
+            )
+
+        if jobs:
+            ids = [job["JobId"] for job in jobs]
+            cursor.execute(f"""
+                UPDATE gradingjob
+                SET Status = 'running', Attempts = Attempts + 1, LeaseOwner = %s,
+                    LeaseExpiresAt = NOW(3) + INTERVAL %s MICROSECOND,
+                    StartedAt = COALESCE(StartedAt, NOW(3))
+                WHERE JobId IN ({', '.join(['%s'] * len(ids))})
+            """, (worker_id, int(lease_seconds * 1_000_000), *ids))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for job in jobs:
+        job["Payload"] = json.loads(job["Payload"])
+        job["Attempts"] += 1
+    return jobs
+
+
+def extend_lease(job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE gradingjob SET LeaseExpiresAt = NOW(3) + INTERVAL %s MICROSECOND
+        WHERE JobId = %s AND LeaseOwner = %s AND Status = 'running'
+    """, (int(lease_seconds * 1_000_000), job_id, worker_id))
+    still_owned = cursor.rowcount == 1
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return still_owned
+
+
+def complete_job(job_id: int, worker_id: str):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE gradingjob SET Status = 'done', FinishedAt = NOW(3), LeaseOwner = NULL, LeaseExpiresAt = NULL, LastError = NULL
+        WHERE JobId = %s AND LeaseOwner = %s
+    """, (job_id, worker_id))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def fail_job(job_id: int, worker_id: str, error: str, retry_delay_seconds: float) -> str:
+    """Requeue the job after `retry_delay_seconds`, or dead-letter it once it
+    has used all its attempts. Returns the new status."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE gradingjob
+        SET Status = IF(Attempts >= MaxAttempts, 'dead', 'queued'),
+            AvailableAt = NOW(3) + INTERVAL %s MICROSECOND,
+            FinishedAt = IF(Attempts >= MaxAttempts, NOW(3), NULL),
+            LeaseOwner = NULL, LeaseExpiresAt = NULL, LastError = %s
+        WHERE JobId = %s AND LeaseOwner = %s
+    """, (int(retry_delay_seconds * 1_000_000), error[:4000], job_id, worker_id))
+    cursor.execute("SELECT Status FROM gradingjob WHERE JobId = %s", (job_id,))
+    row = cursor.fetchone()
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return row[0] if row else None
+
+
+def purge_finished_jobs(retention_hours: float, batch_size: int = 1000) -> int:
+    """Delete done jobs finished more than `retention_hours` ago, in batches
+    so the delete never holds many row locks at once. Dead jobs are kept
+    for inspection and requeueing."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    purged = 0
+    try:
+        while True:
+            cursor.execute("""
+                DELETE FROM gradingjob
+                WHERE Status = 'done' AND FinishedAt < NOW(3) - INTERVAL %s SECOND
+                ORDER BY FinishedAt
+                LIMIT %s
+            """, (int(retention_hours * 3600), batch_size))
+            deleted = cursor.rowcount
+            conn.commit()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def requeue_dead_jobs(job_ids: list = None) -> int:
+    conn = get_connection()
+    cursor = conn.cursor()
+    query = """
+        UPDATE gradingjob SET Status = 'queued', Attempts = 0, AvailableAt = NOW(3), FinishedAt = NULL
+        WHERE Status = 'dead'
+    """
+    params = ()
+    if job_ids:
+        query += f" AND JobId IN ({', '.join(['%s'] * len(job_ids))})"
+        params = tuple(job_ids)
+    cursor.execute(query, params)
+    count = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return count
+
+
+def get_dead_jobs(limit: int = 100) -> list:
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT JobId, Kind, ModuleName, Model, Attempts, LastError, CreatedAt, FinishedAt
+        FROM gradingjob WHERE Status = 'dead'
+        ORDER BY FinishedAt DESC LIMIT %s
+    """, (limit,))
+    jobs = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return jobs
+
+
+def get_queue_stats() -> dict:
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT Status, COUNT(*) AS Jobs FROM gradingjob GROUP BY Status")
+    by_status = {row["Status"]: row["Jobs"] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT TIMESTAMPDIFF(MICROSECOND, MIN(CreatedAt), NOW(3)) / 1000000 AS OldestAge
+        FROM gradingjob WHERE Status IN ('queued', 'running')
+    """)
+    oldest = cursor.fetchone()["OldestAge"]
+
+    cursor.execute("""
+        SELECT
+            SUM(FinishedAt >= NOW(3) - INTERVAL 1 MINUTE) AS LastMinute,
+            SUM(FinishedAt >= NOW(3) - INTERVAL 5 MINUTE) AS Last5Minutes
+        FROM gradingjob WHERE Status = 'done' AND FinishedAt >= NOW(3) - INTERVAL 5 MINUTE
+    """)
+    throughput = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT Model, COUNT(*) AS Jobs FROM gradingjob
+        WHERE Status = 'queued' GROUP BY Model
+    """)
+    queued_by_model = {row["Model"]: row["Jobs"] for row in cursor.fetchall()}
+    cursor.close()
+    conn.close()
+
+    return {
+        "queue_depth": by_status.get("queued", 0),
+        "running": by_status.get("running", 0),
+        "done": by_status.get("done", 0),
+        "dead": by_status.get("dead", 0),
+        "queued_by_model": queued_by_model,
+        "oldest_job_age_seconds": float(oldest) if oldest is not None else 0.0,
+        "completed_last_minute": int(throughput["LastMinute"] or 0),
+        "jobs_per_second_5m": round(int(throughput["Last5Minutes"] or 0) / 300, 3),
+    }
@@ -0,0 +1,136 @@
+# db/services/grading_trace_service.py
+#
+# One compact row per finished grading job (written by the queue consumer
+# in backtask/job_queue.py from the job's grader/metrics.py trace): module,
+# model, retries, cache/fast-path hit, per-stage seconds and the final
+# status. get_latency_report() turns a time window of rows into p50/p95
+# per module and per exam for capacity planning.
+
+import json
+from collections import defaultdict
+from db.mysql_connect import get_connection
+
+GRADING_TRACE_TABLE = """
+    CREATE TABLE IF NOT EXISTS gradingtrace (
+        TraceId BIGINT AUTO_INCREMENT PRIMARY KEY,
+        JobId BIGINT NULL,
+        Kind VARCHAR(32) NOT NULL,
+        ModuleName VARCHAR(255) NULL,
+        ExamId INT NULL,
+        QuestionId INT NULL,
+        Model VARCHAR(128) NULL,
+        Method VARCHAR(64) NULL,
+        Attempt INT NOT NULL DEFAULT 1,
+        LlmCalls INT NOT NULL DEFAULT 0,
+        Retries INT NOT NULL DEFAULT 0,
+        CacheHit BOOLEAN NOT NULL DEFAULT FALSE,
+        FastPath BOOLEAN NOT NULL DEFAULT FALSE,
+        Status VARCHAR(16) NOT NULL,
+        Seconds DOUBLE NOT NULL,
+        Stages JSON NOT NULL,
+        Error VARCHAR(255) NULL,
+        CreatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        INDEX idx_gradingtrace_created (CreatedAt),
+        INDEX idx_gradingtrace_module (ModuleName, CreatedAt),
+        INDEX idx_gradingtrace_exam (ExamId, CreatedAt)
+    )
+"""
+
+
+def ensure_table():
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(GRADING_TRACE_TABLE)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def record_trace(trace: dict, status: str, job_id: int = None):
+    """Insert a finished grader.metrics trace; `status` is the job's outcome
+    (done, retry, dead)."""
+    fields = trace["fields"]
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO gradingtrace
+            (JobId, Kind, ModuleName, ExamId, QuestionId, Model, Method, Attempt, LlmCalls, Retries,
+             CacheHit, FastPath, Status, Seconds, Stages, Error)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (
+        job_id, trace["kind"], fields.get("module"), fields.get("exam_id"), fields.get("question_id"),
+        fields.get("model"), fields.get("method"), fields.get("attempt") or 1, fields.get("llm_calls") or 0,
+        fields.get("retries") or 0, bool(fields.get("cached")), bool(fields.get("fast_path")), status,
+        round(trace["seconds"], 4), json.dumps({name: round(value, 4) for name, value in trace["stages"].items()}),
+        (fields.get("error") or "")[:255] or None
+    ))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def _percentile(values: list, p: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(p * len(values)))], 3)
+
+
+def _summarize(rows: list) -> dict:
+    stages = defaultdict(list)
+    for row in rows:
+        for name, seconds in row["Stages"].items():
+            stages[name].append(seconds)
+    seconds = [row["Seconds"] for row in rows]
+    return {
+        "jobs": len(rows),
+        "failed": sum(1 for row in rows if row["Status"] != "done"),
+        "p50_seconds": _percentile(seconds, 0.50),
+        "p95_seconds": _percentile(seconds, 0.95),
+        "cache_hits": sum(1 for row in rows if row["CacheHit"]),
+        "fast_path_hits": sum(1 for row in rows if row["FastPath"]),
+        "llm_calls_per_job": round(sum(row["LlmCalls"] for row in rows) / len(rows), 3),
+        "retries": sum(row["Retries"] for row in rows),
+        "stages": {
+            name: {"p50_seconds": _percentile(values, 0.50), "p95_seconds": _percentile(values, 0.95)}
+            for name, values in sorted(stages.items())
+        },
+    }
+
+
+def get_latency_report(window_minutes: int = 1440, module_name: str = None, exam_id: int = None) -> dict:
+    """p50/p95 job and stage latency per module and per exam over the last
+    `window_minutes`, optionally for one module or exam."""
+    filters = ["CreatedAt >= NOW(3) - INTERVAL %s MINUTE"]
+    params = [window_minutes]
+    if module_name:
+        filters.append("ModuleName = %s")
+        params.append(module_name)
+    if exam_id is not None:
+        filters.append("ExamId = %s")
+        params.append(exam_id)
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT ModuleName, ExamId, Kind, Status, Seconds, Stages, LlmCalls, Retries, CacheHit, FastPath
+        FROM gradingtrace WHERE {' AND '.join(filters)}
+    """, tuple(params))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    by_module = defaultdict(list)
+    by_exam = defaultdict(list)
+    for row in rows:
+        row["Stages"] = json.loads(row["Stages"]) if isinstance(row["Stages"], str) else row["Stages"] or {}
+        by_module[row["ModuleName"] or "unknown"].append(row)
+        if row["ExamId"] is not None:
+            by_exam[row["ExamId"]].append(row)
+
+    return {
+        "window_minutes": window_minutes,
+        "jobs": len(rows),
+        "modules": {name: _summarize(module_rows) for name, module_rows in sorted(by_module.items())},
+        "exams": {exam: _summarize(exam_rows) for exam, exam_rows in sorted(by_exam.items())},
+    }
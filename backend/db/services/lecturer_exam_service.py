@@ -1,6 +1,33 @@
 from db.mysql_connect import get_connection
+from db.services import grading_job_service, question_context_service
+from grader import registry
 from typing import List, Dict, Any
 
+# New or replaced questions get their retrieval context precomputed by a
+# "question_context" grading job (grader/question_context.py). The job
+# carries the exam's module and model like grading jobs do, so workers
+# started for specific modules claim it.
+def _precompute_context(exam_id: int, question_ids: List[int]):
+    if not question_ids:
+        return
+    # Runs after the questions are committed; grading computes missing
+    # context itself, so a failed enqueue must not fail the request
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT m.ModuleName FROM exam e JOIN module m ON m.ModuleId = e.ModuleId WHERE e.ExamId = %s
+        """, (exam_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        conn.close()
+
+        module_name = row[0] if row else None
+        model = registry.get_module_config(module_name)["llm"]["model"] if module_name in registry.module_names() else None
+        grading_job_service.enqueue_job("question_context", {"question_ids": question_ids}, module_name, model)
+    except Exception as e:
+        print(f"[WARN] Could not queue question context for exam {exam_id}: {e}")
+
 def get_all_exams():
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
@@ -37,8 +64,10 @@ def add_question(exam_id: int, data: Dict[str, Any]):
         data.get("moduleId"),
         exam_id
     ))
+    question_id = cursor.lastrowid
     conn.commit()
     conn.close()
+    _precompute_context(exam_id, [question_id])
     return {"message": "Question added successfully"}
 
 def delete_exam_with_auth(exam_id: int, username: str, password: str):
@@ -55,6 +84,8 @@ def delete_exam_with_auth(exam_id: int, username: str, password: str):
         conn.close()
         return None
     
+    cursor.execute("SELECT QuestionId FROM question WHERE ExamId = %s", (exam_id,))
+    question_context_service.delete_contexts(cursor, [row["QuestionId"] for row in cursor.fetchall()])
     cursor.execute("DELETE FROM studentexam WHERE ExamId = %s", (exam_id,))
     cursor.execute("DELETE FROM question WHERE ExamId = %s", (exam_id,))
 
@@ -119,6 +150,7 @@ def create_exam(exam_data: Dict[str, Any]):
 def add_questions_to_exam(exam_id: int, questions: List[Dict[str, Any]]):
     conn = get_connection()
     cursor = conn.cursor()
+    question_ids = []
 
     for q in questions:
         # q is a dict here (from Pydantic model converted to dict on FastAPI side)
@@ -133,9 +165,11 @@ def add_questions_to_exam(exam_id: int, questions: List[Dict[str, Any]]):
             exam_id,
             q.get("moduleId")  # IMPORTANT: moduleId must be present in question payload or fixed logic needed
         ))
+        question_ids.append(cursor.lastrowid)
 
     conn.commit()
     conn.close()
+    _precompute_context(exam_id, question_ids)
 
 def get_modules():
     conn = get_connection()
@@ -189,8 +223,11 @@ def update_exam_questions(exam_id: int, questions: List[Dict[str, Any]]):
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Delete old questions first
+    # Delete old questions (and their precomputed context) first
+    cursor.execute("SELECT QuestionId FROM question WHERE ExamId = %s", (exam_id,))
+    question_context_service.delete_contexts(cursor, [row[0] for row in cursor.fetchall()])
     cursor.execute("DELETE FROM question WHERE ExamId = %s", (exam_id,))
+    question_ids = []
 
     # Insert new questions
     for q in questions:
@@ -204,13 +241,16 @@ def update_exam_questions(exam_id: int, questions: List[Dict[str, Any]]):
             q.get("moduleId"),
             exam_id
         ))
+        question_ids.append(cursor.lastrowid)
 
     conn.commit()
     conn.close()
+    _precompute_context(exam_id, question_ids)
 
 def delete_question(question_id: int):
     conn = get_connection()
     cursor = conn.cursor()
+    question_context_service.delete_contexts(cursor, [question_id])
     cursor.execute("DELETE FROM question WHERE QuestionId = %s", (question_id,))
     conn.commit()
     conn.close()
@@ -0,0 +1,82 @@
+# db/services/question_context_service.py
+#
+# Retrieval context precomputed per question (grader/question_context.py):
+# the top-k reference rows for the question + model answer and the model
+# answer's embedding. Rows are written by "question_context" jobs queued
+# when lecturers add or replace questions, and deleted with the question.
+# ContentHash/CorpusHash let readers ignore rows computed for an older
+# question text or reference corpus.
+
+import json
+from db.mysql_connect import get_connection
+
+QUESTION_CONTEXT_TABLE = """
+    CREATE TABLE IF NOT EXISTS questioncontext (
+        QuestionId INT PRIMARY KEY,
+        ModuleName VARCHAR(255) NOT NULL,
+        ContentHash CHAR(64) NOT NULL,
+        CorpusHash CHAR(64) NOT NULL,
+        ReferenceIds JSON NOT NULL,
+        ModelAnswerEmbedding BLOB NULL,
+        UpdatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+    )
+"""
+
+
+def ensure_table():
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(QUESTION_CONTEXT_TABLE)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def get_questions(question_ids: list) -> list:
+    if not question_ids:
+        return []
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"""
+        SELECT q.QuestionId, q.QuestionName, q.ModelAnswer, m.ModuleName
+        FROM question q
+        JOIN exam e ON e.ExamId = q.ExamId
+        JOIN module m ON m.ModuleId = e.ModuleId
+        WHERE q.QuestionId IN ({', '.join(['%s'] * len(question_ids))})
+    """, tuple(question_ids))
+    questions = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return questions
+
+
+def save_contexts(contexts: list):
+    """contexts: [{"question_id", "module", "content_hash", "corpus_hash",
+    "reference_ids", "model_answer_embedding" (bytes or None)}]"""
+    if not contexts:
+        return
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO questioncontext (QuestionId, ModuleName, ContentHash, CorpusHash, ReferenceIds, ModelAnswerEmbedding)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            ModuleName = VALUES(ModuleName), ContentHash = VALUES(ContentHash), CorpusHash = VALUES(CorpusHash),
+            ReferenceIds = VALUES(ReferenceIds), ModelAnswerEmbedding = VALUES(ModelAnswerEmbedding)
+    """, [
+        (c["question_id"], c["module"], c["content_hash"], c["corpus_hash"],
+         json.dumps(c["reference_ids"]), c["model_answer_embedding"])
+        for c in contexts
+    ])
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def delete_contexts(cursor, question_ids: list):
+    """Runs on the caller's cursor so it commits with the question change."""
+    if question_ids:
+        cursor.execute(
+            f"DELETE FROM questioncontext WHERE QuestionId IN ({', '.join(['%s'] * len(question_ids))})",
+            tuple(question_ids)
+        )
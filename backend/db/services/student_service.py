@@ -143,10 +143,13 @@ def get_module_name_by_exam_id(exam_id: int):
 
 def get_question_with_model_answer(question_id: int) -> dict | None:
     conn = get_connection()
+    # Includes the precomputed retrieval context, if any (questioncontext)
     query = """
-    SELECT QuestionName, ModelAnswer 
-    FROM Question 
-    WHERE QuestionId = %s
+    SELECT q.QuestionName, q.ModelAnswer,
+           qc.ReferenceIds, qc.ContentHash, qc.CorpusHash, qc.ModelAnswerEmbedding
+    FROM Question q
+    LEFT JOIN questioncontext qc ON qc.QuestionId = q.QuestionId
+    WHERE q.QuestionId = %s
     """
     cursor = conn.cursor(dictionary=True)
     cursor.execute(query, (question_id,))
@@ -172,4 +175,106 @@ def is_all_questions_graded(user_id: int, exam_id: int) -> bool:
         return total_questions == finalized_count
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+# Whole-exam grading: every finalized, not yet graded answer of one
+# student's exam with its question, mark and module, plus the counts
+# needed to decide the exam status, in one query.
+def get_answers_to_grade(user_id: int, exam_id: int) -> list:
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT
+                sa.QuestionId, sa.StdAnswer, q.QuestionName, q.ModelAnswer, q.QuestionMark, m.ModuleName,
+                qc.ReferenceIds, qc.ContentHash, qc.CorpusHash, qc.ModelAnswerEmbedding,
+                (SELECT COUNT(*) FROM question WHERE ExamId = sa.ExamId) AS TotalQuestions,
+                (SELECT COUNT(*) FROM studentanswer
+                 WHERE UserId = sa.UserId AND ExamId = sa.ExamId AND IsFinalized = 1) AS FinalizedAnswers
+            FROM studentanswer sa
+            JOIN question q ON q.QuestionId = sa.QuestionId
+            JOIN exam e ON e.ExamId = sa.ExamId
+            JOIN module m ON m.ModuleId = e.ModuleId
+            LEFT JOIN questioncontext qc ON qc.QuestionId = sa.QuestionId
+            WHERE sa.UserId = %s AND sa.ExamId = %s AND sa.IsFinalized = 1 AND sa.Feedback IS NULL
+        """, (user_id, exam_id))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+# grades: [{"question_id", "score", "feedback"}]; all scores and the exam
+# status are written in one transaction.
+def save_exam_grades(user_id: int, exam_id: int, grades: list, exam_status: str):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("""
+            UPDATE studentanswer SET Score = %s, Feedback = %s
+            WHERE UserId = %s AND ExamId = %s AND QuestionId = %s
+        """, [(g["score"], g["feedback"], user_id, exam_id, g["question_id"]) for g in grades])
+        cursor.execute("""
+            UPDATE StudentExam SET Status=%s, SubmittedAt=NOW()
+            WHERE UserId=%s AND ExamId=%s
+        """, (exam_status, user_id, exam_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+# Per-question grading: every finalized, not yet graded answer to one
+# question across students, with the question's precomputed context.
+def get_question_answers_to_grade(exam_id: int, question_id: int) -> list:
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT
+                sa.UserId, sa.StdAnswer, q.QuestionName, q.ModelAnswer, q.QuestionMark, m.ModuleName,
+                qc.ReferenceIds, qc.ContentHash, qc.CorpusHash, qc.ModelAnswerEmbedding
+            FROM studentanswer sa
+            JOIN question q ON q.QuestionId = sa.QuestionId
+            JOIN exam e ON e.ExamId = sa.ExamId
+            JOIN module m ON m.ModuleId = e.ModuleId
+            LEFT JOIN questioncontext qc ON qc.QuestionId = sa.QuestionId
+            WHERE sa.ExamId = %s AND sa.QuestionId = %s AND sa.IsFinalized = 1 AND sa.Feedback IS NULL
+            ORDER BY sa.UserId
+        """, (exam_id, question_id))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+# grades: [{"user_id", "score", "feedback"}]; scores and each student's exam
+# status (completed once all questions are finalized, as in
+# is_all_questions_graded) are written in one transaction.
+def save_question_grades(exam_id: int, question_id: int, grades: list):
+    if not grades:
+        return
+    user_ids = [g["user_id"] for g in grades]
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("""
+            UPDATE studentanswer SET Score = %s, Feedback = %s
+            WHERE UserId = %s AND ExamId = %s AND QuestionId = %s
+        """, [(g["score"], g["feedback"], g["user_id"], exam_id, question_id) for g in grades])
+        cursor.execute(f"""
+            UPDATE StudentExam se
+            SET se.Status = IF(
+                    (SELECT COUNT(*) FROM studentanswer sa
+                     WHERE sa.UserId = se.UserId AND sa.ExamId = se.ExamId AND sa.IsFinalized = 1)
+                    = (SELECT COUNT(*) FROM question q WHERE q.ExamId = se.ExamId),
+                    'completed', 'pending'),
+                se.SubmittedAt = NOW()
+            WHERE se.ExamId = %s AND se.UserId IN ({', '.join(['%s'] * len(user_ids))})
+        """, (exam_id, *user_ids))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
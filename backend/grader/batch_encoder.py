@@ -0,0 +1,169 @@
+# grader/batch_encoder.py
+
+import os
+import time
+import queue
+import threading
+import numpy as np
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, List
+
+from grader.embeddings import embedding_service
+
+# Concurrent grading jobs each encode one student answer. The batch encoder
+# collects those requests for up to EMBED_MAX_WAIT_MS and runs them through
+# the model as one forward pass, handing every caller back its own rows.
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 32))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", 5))
+# Whole-exam grading encodes all of an exam's answers up front with
+# prime(), and precomputed question contexts hand in stored model-answer
+# embeddings with remember(); later encode() calls for those texts are
+# served from here.
+EMBED_PRIMED_SIZE = int(os.getenv("EMBED_PRIMED_SIZE", 4096))
+
+LATENCY_WINDOW = 1024
+
+
+class BatchEncoder:
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = EMBED_BATCH_SIZE, max_wait_ms: float = EMBED_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+        self._max_batch = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._batch_sizes = deque(maxlen=LATENCY_WINDOW)
+
+        self._primed = OrderedDict()
+        self._primed_lock = threading.Lock()
+        self._primed_hits = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._thread.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+        rows = self._lookup(texts)
+        missing = [text for text, row in zip(texts, rows) if row is None]
+        if not missing:
+            return np.stack(rows)
+        self._ensure_started()
+        future = Future()
+        self._queue.put((missing, future, time.perf_counter()))
+        encoded = future.result()
+        if len(missing) == len(texts):
+            return encoded
+        fresh = iter(encoded)
+        return np.stack([row if row is not None else next(fresh) for row in rows])
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+    def prime(self, texts: List[str]):
+        """Encode texts in one pass and keep them for later encode() calls."""
+        texts = list(dict.fromkeys(text for text in texts if text))
+        if not texts:
+            return
+        self.remember(texts, self.encode(texts))
+
+    def remember(self, texts: List[str], embeddings: np.ndarray):
+        with self._primed_lock:
+            for text, row in zip(texts, embeddings):
+                self._primed[text] = row
+                self._primed.move_to_end(text)
+            while len(self._primed) > EMBED_PRIMED_SIZE:
+                self._primed.popitem(last=False)
+
+    def _lookup(self, texts: List[str]) -> list:
+        with self._primed_lock:
+            rows = [self._primed.get(text) for text in texts]
+            self._primed_hits += sum(row is not None for row in rows)
+            return rows
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        count = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while count < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending, count
+
+    def _run(self):
+        while True:
+            pending, count = self._collect()
+            texts = [text for item_texts, _, _ in pending for text in item_texts]
+
+            try:
+                embeddings = np.asarray(self.encode_fn(texts))
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                continue
+
+            done = time.perf_counter()
+            offset = 0
+            for item_texts, future, enqueued in pending:
+                future.set_result(embeddings[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(pending)
+                self._texts += count
+                self._max_batch = max(self._max_batch, count)
+                self._batch_sizes.append(count)
+                self._latencies.extend(done - enqueued for _, _, enqueued in pending)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            batch_sizes = list(self._batch_sizes)
+            batches, requests, texts, max_batch = self._batches, self._requests, self._texts, self._max_batch
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "requests": requests,
+            "texts": texts,
+            "max_batch": max_batch,
+            "avg_batch_size": round(texts / batches, 2) if batches else 0,
+            "recent_avg_batch_size": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_p99": percentile(0.99),
+            "primed_texts": len(self._primed),
+            "primed_hits": self._primed_hits,
+        }
+
+
+batch_encoder = BatchEncoder(embedding_service.encode)
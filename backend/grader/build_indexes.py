@@ -0,0 +1,108 @@
+# grader/build_indexes.py
+#
+# Offline index build, run at image build time:
+#   python -m grader.build_indexes [--force] [module name ...]
+#
+# For every registered module this compiles the reference corpus, encodes
+# it, writes indexes/<module>_index/index.faiss and a manifest.json with the
+# embedding model, dimension and corpus hash. The server only opens these
+# artifacts read-only and refuses ones that do not match. Nothing under
+# indexes/ is committed: a fresh checkout runs this once before starting
+# the server (the Docker image does it at build time).
+
+import os
+import sys
+import time
+from typing import List
+
+from grader import registry
+from grader.corpus import compile_corpus, compiled_corpus_path
+from grader.embedding_store import corpus_hash, load_or_build_embeddings, read_manifest, write_manifest
+from grader.embeddings import EMBEDDING_MODEL_NAME
+
+
+class StaleIndexError(RuntimeError):
+    pass
+
+
+def build_module(config: dict, force: bool = False) -> dict:
+    import faiss
+    from grader.embeddings import embedding_service
+
+    start = time.perf_counter()
+    store_dir = os.path.dirname(config["index_path"])
+    corpus = compile_corpus(config["corpus_path"], compiled_corpus_path(config))
+
+    embeddings, _ = load_or_build_embeddings(
+        store_dir,
+        config["corpus_path"],
+        corpus.texts(),
+        lambda batch: embedding_service.encode(batch, convert_to_numpy=True),
+        EMBEDDING_MODEL_NAME,
+        force=force
+    )
+
+    index = faiss.IndexFlatL2(embeddings.shape[1])
+    index.add(embeddings)
+    tmp_path = config["index_path"] + ".tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, config["index_path"])
+
+    manifest = read_manifest(store_dir)
+    manifest.update({
+        "module": config["name"],
+        "index_file": os.path.basename(config["index_path"]),
+        "index_ntotal": int(index.ntotal),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    write_manifest(store_dir, manifest)
+
+    print(f"[INFO] Built index for {config['name']}: {index.ntotal} docs, dim {index.d}, {time.perf_counter() - start:.2f}s")
+    return manifest
+
+
+def check_index(config: dict) -> List[str]:
+    store_dir = os.path.dirname(config["index_path"])
+    manifest = read_manifest(store_dir)
+    if not manifest:
+        return [f"no manifest in {store_dir}"]
+
+    problems = []
+    if not os.path.exists(config["index_path"]):
+        problems.append(f"missing {config['index_path']}")
+    if manifest.get("corpus_hash") != corpus_hash(config["corpus_path"]):
+        problems.append(f"{config['corpus_path']} changed since the index was built")
+    if manifest.get("embedding_model") != EMBEDDING_MODEL_NAME:
+        problems.append(f"built with {manifest.get('embedding_model')}, server uses {EMBEDDING_MODEL_NAME}")
+    if manifest.get("index_ntotal") != manifest.get("count"):
+        problems.append("index and embeddings have different row counts")
+    return problems
+
+
+def stale_index_error(config: dict, problems: List[str]) -> StaleIndexError:
+    return StaleIndexError(
+        f"Index for {config['name']} is stale or missing ({'; '.join(problems)}). "
+        f"Run: python -m grader.build_indexes \"{config['name']}\""
+    )
+
+
+def verify_indexes(module_names: List[str] = None):
+    errors = []
+    for name in module_names if module_names is not None else registry.module_names():
+        config = registry.get_module_config(name)
+        problems = check_index(config)
+        if problems:
+            errors.append(str(stale_index_error(config, problems)))
+    if errors:
+        raise StaleIndexError(
+            "Grader indexes are stale or missing. Build them with: python -m grader.build_indexes\n" + "\n".join(errors)
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    force = "--force" in args
+    names = [arg for arg in args if arg != "--force"] or registry.module_names()
+
+    for name in names:
+        build_module(registry.get_module_config(name), force=force)
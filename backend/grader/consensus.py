@@ -0,0 +1,92 @@
+# grader/consensus.py
+#
+# Self-consistency grading: instead of the serial grade -> refine -> grade
+# loop, send N samples of the same prompt to the LLM at once, stop as soon
+# as enough of them agree, and combine them into one score plus a
+# spread/confidence value. Configured per module:
+#   "grading_mode": "consensus",
+#   "consensus": {"samples": 3, "min_agree": 2, "tolerance": 1.0}
+
+import asyncio
+import statistics
+from typing import Dict, List
+
+from grader import ollama_client, metrics
+from grader.llm import acall_llm
+from grader.rag_pipeline import build_prompt, parse_response, record_format, generation_options, NO_ANSWER_FEEDBACK
+
+
+def _largest_agreeing_group(scores: List[float], tolerance: float) -> List[float]:
+    best = []
+    for anchor in scores:
+        group = [s for s in scores if abs(s - anchor) <= tolerance]
+        if len(group) > len(best):
+            best = group
+    return best
+
+
+def consensus_grade(config: dict, question_text: str, model_answer: str, student_answer: str, reference_ids: list = None) -> Dict:
+    return ollama_client.run_sync(aconsensus_grade(config, question_text, model_answer, student_answer, reference_ids))
+
+
+async def aconsensus_grade(config: dict, question_text: str, model_answer: str, student_answer: str, reference_ids: list = None) -> Dict:
+    method = f"{config['method']}-consensus"
+
+    if not student_answer.strip():
+        return {
+            "score": 0.0,
+            "feedback": NO_ANSWER_FEEDBACK,
+            "method": method,
+            "samples": 0,
+            "spread": 0.0,
+            "confidence": 1.0
+        }
+
+    settings = config["consensus"]
+    prompt = await asyncio.to_thread(build_prompt, config, question_text, model_answer, student_answer, reference_ids)
+
+    print(f"[INFO] Sending {settings['samples']} samples to {config['llm']['model']} for {config['name']}...")
+    options = generation_options(config)
+    tasks = [asyncio.ensure_future(acall_llm(config, prompt, **options)) for _ in range(settings["samples"])]
+
+    results = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                text = await next_done
+                with metrics.stage("parse", config["name"]):
+                    parsed = record_format(config["llm"]["model"], parse_response(text, config["output_format"]))
+            except Exception as e:
+                print(f"[WARN] Consensus sample failed: {e}")
+                continue
+            if not parsed["parse_ok"]:
+                # A malformed sample carries no score; don't let it vote as 0
+                continue
+            results.append(parsed)
+
+            scores = [r["score"] for r in results if r["score"] is not None]
+            if len(_largest_agreeing_group(scores, settings["tolerance"])) >= settings["min_agree"]:
+                break
+    finally:
+        # Samples still queued or generating are cancelled once we have
+        # agreement, which also closes their Ollama streams
+        for task in tasks:
+            task.cancel()
+
+    scored = [r for r in results if r["score"] is not None]
+    if not scored:
+        return {"score": None, "feedback": None, "method": method, "samples": len(results), "spread": None, "confidence": 0.0}
+
+    scores = [r["score"] for r in scored]
+    group = _largest_agreeing_group(scores, settings["tolerance"])
+    score = statistics.median(group)
+    feedback = min(scored, key=lambda r: abs(r["score"] - score))["feedback"]
+
+    return {
+        "score": score,
+        "feedback": feedback,
+        "method": method,
+        "samples": len(scored),
+        "spread": max(scores) - min(scores),
+        "confidence": round(len(group) / len(scored), 3)
+    }
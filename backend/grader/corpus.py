@@ -0,0 +1,136 @@
+# grader/corpus.py
+
+import os
+import sys
+import json
+import threading
+import numpy as np
+from typing import List, Tuple
+from langchain_core.documents import Document
+
+from grader.embedding_store import corpus_hash
+
+# === Compiled reference corpus ===
+# data/*_questions.json is compiled once into indexes/<module>_index/corpus.npz:
+# all page contents as one UTF-8 blob plus an offsets array (same for the
+# question ids). Grading reads the arrays and only builds a Document for the
+# handful of retrieved rows.
+COMPILED_CORPUS_FILE = "corpus.npz"
+
+
+def compiled_corpus_path(config: dict) -> str:
+    return os.path.join(os.path.dirname(config["index_path"]), COMPILED_CORPUS_FILE)
+
+
+def _pack(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+class CompiledCorpus:
+    def __init__(self, text_blob, text_offsets, id_blob, id_offsets, source_hash: str):
+        self.text_blob = text_blob
+        self.text_offsets = text_offsets
+        self.id_blob = id_blob
+        self.id_offsets = id_offsets
+        self.source_hash = source_hash
+
+    def __len__(self):
+        return len(self.text_offsets) - 1
+
+    def text(self, i: int) -> str:
+        return self.text_blob[self.text_offsets[i]:self.text_offsets[i + 1]].tobytes().decode("utf-8")
+
+    def question_id(self, i: int) -> str:
+        return self.id_blob[self.id_offsets[i]:self.id_offsets[i + 1]].tobytes().decode("utf-8")
+
+    def document(self, i: int) -> Document:
+        return Document(page_content=self.text(i), metadata={"question_id": self.question_id(i)})
+
+    def texts(self) -> List[str]:
+        return [self.text(i) for i in range(len(self))]
+
+
+def compile_corpus(source_path: str, compiled_path: str) -> CompiledCorpus:
+    with open(source_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    items = [item for item in data if item.get("Model Answer")]
+    text_blob, text_offsets = _pack([f"Question: {item['Question']}\nAnswer: {item['Model Answer']}" for item in items])
+    id_blob, id_offsets = _pack([str(item["Question ID"]) for item in items])
+    source_hash = corpus_hash(source_path)
+
+    os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+    tmp_path = compiled_path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        text_blob=text_blob,
+        text_offsets=text_offsets,
+        id_blob=id_blob,
+        id_offsets=id_offsets,
+        source_hash=np.array(source_hash)
+    )
+    os.replace(tmp_path, compiled_path)
+    print(f"[INFO] Compiled {len(items)} reference docs: {source_path} -> {compiled_path}")
+
+    return CompiledCorpus(text_blob, text_offsets, id_blob, id_offsets, source_hash)
+
+
+def _read_compiled(compiled_path: str) -> CompiledCorpus:
+    with np.load(compiled_path) as data:
+        return CompiledCorpus(
+            data["text_blob"],
+            data["text_offsets"],
+            data["id_blob"],
+            data["id_offsets"],
+            str(data["source_hash"])
+        )
+
+
+# compiled path -> CompiledCorpus; refreshed when the source hash changes
+_cache = {}
+_lock = threading.Lock()
+
+
+def load_corpus(source_path: str, compiled_path: str) -> CompiledCorpus:
+    # corpus_hash() only re-reads the source when its mtime or size changed
+    digest = corpus_hash(source_path)
+
+    cached = _cache.get(compiled_path)
+    if cached is not None and cached.source_hash == digest:
+        return cached
+
+    with _lock:
+        cached = _cache.get(compiled_path)
+        if cached is not None and cached.source_hash == digest:
+            return cached
+
+        corpus = None
+        if os.path.exists(compiled_path):
+            corpus = _read_compiled(compiled_path)
+            if corpus.source_hash != digest:
+                corpus = None
+
+        if corpus is None:
+            corpus = compile_corpus(source_path, compiled_path)
+
+        _cache[compiled_path] = corpus
+        return corpus
+
+
+def evict(compiled_path: str):
+    with _lock:
+        _cache.pop(compiled_path, None)
+
+
+# python -m grader.corpus  -- compile every registered module's corpus
+if __name__ == "__main__":
+    from grader import registry
+
+    names = sys.argv[1:] or registry.module_names()
+    for name in names:
+        config = registry.get_module_config(name)
+        compile_corpus(config["corpus_path"], compiled_corpus_path(config))
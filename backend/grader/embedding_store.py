@@ -0,0 +1,89 @@
+# grader/embedding_store.py
+
+import os
+import json
+import hashlib
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+# Reference embeddings are stored next to each module's FAISS index
+# (indexes/<module>_index/) and keyed by a hash of the data/*.json corpus,
+# so the corpus is only re-encoded when the file actually changes.
+EMBEDDINGS_FILE = "embeddings.npy"
+MANIFEST_FILE = "manifest.json"
+
+# abs path -> ((mtime_ns, size), sha256)
+_hash_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+
+def corpus_hash(corpus_path: str) -> str:
+    path = os.path.abspath(corpus_path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _hash_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(path, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+
+    _hash_cache[path] = (signature, digest)
+    return digest
+
+
+def read_manifest(store_dir: str) -> dict:
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_manifest(store_dir: str, manifest: dict):
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def load_or_build_embeddings(
+    store_dir: str,
+    corpus_path: str,
+    texts: List[str],
+    encode: Callable[[List[str]], np.ndarray],
+    model_name: str,
+    force: bool = False
+) -> Tuple[np.ndarray, bool]:
+    """Return (embeddings, rebuilt). Re-encodes only when the corpus or model changed."""
+    digest = corpus_hash(corpus_path)
+    embeddings_path = os.path.join(store_dir, EMBEDDINGS_FILE)
+    manifest = read_manifest(store_dir)
+
+    if (
+        not force
+        and manifest.get("corpus_hash") == digest
+        and manifest.get("embedding_model") == model_name
+        and manifest.get("count") == len(texts)
+        and os.path.exists(embeddings_path)
+    ):
+        return np.load(embeddings_path), False
+
+    print(f"[INFO] Encoding {len(texts)} reference docs for {store_dir}")
+    embeddings = np.asarray(encode(texts), dtype="float32")
+
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = embeddings_path + ".tmp.npy"
+    np.save(tmp_path, embeddings)
+    os.replace(tmp_path, embeddings_path)
+
+    write_manifest(store_dir, {
+        **manifest,
+        "corpus_path": corpus_path,
+        "corpus_hash": digest,
+        "embedding_model": model_name,
+        "count": len(texts),
+        "dimension": int(embeddings.shape[1]),
+    })
+    return embeddings, True
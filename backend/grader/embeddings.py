@@ -0,0 +1,105 @@
+# grader/embeddings.py
+
+import os
+import sys
+import time
+import threading
+import numpy as np
+from typing import List
+
+# One SentenceTransformer per process, shared by every grading module.
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+
+def _load_sentence_transformer():
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+
+    first_param = next(model.parameters(), None)
+    if first_param is not None and first_param.device.type == 'meta':
+        model = model.to_empty(torch.device(device))
+
+    # Force initialization to prevent meta tensor issues
+    _ = model.encode(["warmup"], convert_to_numpy=True)
+    return model
+
+
+class EmbeddingService:
+    def __init__(self):
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self.load_seconds = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = _load_sentence_transformer()
+                    self.load_seconds = time.perf_counter() - start
+                    print(f"[INFO] Loaded embedding model {EMBEDDING_MODEL_NAME} in {self.load_seconds:.2f}s")
+        return self._model
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        kwargs.setdefault("convert_to_numpy", True)
+        model = self.model
+        with self._encode_lock:
+            return model.encode(texts, **kwargs)
+
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+embedding_service = EmbeddingService()
+
+
+def encode(texts: List[str], **kwargs) -> np.ndarray:
+    return embedding_service.encode(texts, **kwargs)
+
+
+# === Memory / startup measurement ===
+# python -m grader.embeddings [copies]
+# Compares loading one shared model with loading one copy per module.
+# Measured with an all-MiniLM-L6-v2-shaped model (22.7M fp32 parameters,
+# EMBEDDING_MODEL pointing at a local copy), 1 CPU, files in page cache:
+#   shared service : 1 model,   63.5 MiB, 0.12-0.22s
+#   per-module     : 5 models, 232.4 MiB, 0.49-0.80s
+# Importing torch + sentence_transformers costs ~750 MiB and ~7s once per
+# process either way.
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    import torch  # noqa: F401  (exclude torch import cost from both numbers)
+    import sentence_transformers  # noqa: F401
+
+    base = rss_mb()
+    start = time.perf_counter()
+    embedding_service.model
+    shared_seconds = time.perf_counter() - start
+    shared_mb = rss_mb() - base
+
+    start = time.perf_counter()
+    extra = [_load_sentence_transformer() for _ in range(copies - 1)]
+    per_module_seconds = shared_seconds + (time.perf_counter() - start)
+    per_module_mb = rss_mb() - base
+
+    print(f"shared service : 1 model,  {shared_mb:8.1f} MiB, {shared_seconds:6.2f}s")
+    print(f"per-module     : {copies} models, {per_module_mb:8.1f} MiB, {per_module_seconds:6.2f}s")
@@ -0,0 +1,138 @@
+# grader/frontend.py
+
+import asyncio
+
+from grader.grade_cache import GradeCache, grade_cache, cache_key
+from grader.mcq import grade_mcq
+from grader.prescore import prescore
+from grader.multi_answer import agrade_batch
+from grader import metrics
+
+# === Grading front end ===
+# Sits in front of a module's LangGraph with the same invoke()/ainvoke() contract:
+#   1. multiple-choice fast path (exact option matching, no LLM)
+#   2. grading result cache
+#   3. embedding pre-scoring (empty / near-identical / off-topic answers)
+#   4. the LangGraph grading loop
+# ainvoke_many() grades several answers of one student, packing the ones
+# that reach step 4 into multi-answer prompts when the module enables it.
+
+
+class GradingFrontend:
+    def __init__(self, graph, config: dict, cache: GradeCache = grade_cache):
+        self.graph = graph
+        self.config = config
+        self.cache = cache
+
+    def _fast_path(self, input_data: dict, method: str = None):
+        question = input_data.get("question")
+        model_answer = input_data.get("model_answer")
+        student_answer = input_data.get("student_answer")
+
+        fast = grade_mcq(question, model_answer, student_answer)
+        if fast is not None:
+            return {**input_data, **fast, "retry_count": 0}, None
+
+        key = cache_key(self.config, question, model_answer, student_answer, method)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"[INFO] Grade cache hit for {self.config['name']}")
+            return {**input_data, **cached, "cached": True}, key
+        return None, key
+
+    def _prescored(self, input_data: dict):
+        with metrics.stage("prescore", self.config["name"]):
+            settled = prescore(self.config, input_data.get("model_answer"), input_data.get("student_answer"))
+        if settled is not None:
+            return {**input_data, **settled, "retry_count": 0}
+        return None
+
+    def _store(self, key: str, result: dict, *more_keys: str) -> dict:
+        # Only grades read from a well-formed response; a format failure
+        # would otherwise be served for this answer until evicted
+        if result.get("score") is not None and result.get("parse_ok", True):
+            for key in (key, *more_keys):
+                self.cache.put(key, result)
+        return result
+
+    def invoke(self, input_data: dict, *args, **kwargs) -> dict:
+        result, key = self._fast_path(input_data)
+        if result is None:
+            result = self._prescored(input_data)
+        if result is not None:
+            return result
+        return self._store(key, self.graph.invoke(input_data, *args, **kwargs))
+
+    async def ainvoke(self, input_data: dict, *args, **kwargs) -> dict:
+        result, key = self._fast_path(input_data)
+        if result is None:
+            # Embedding the answer is CPU-bound; keep it off the event loop
+            result = await asyncio.to_thread(self._prescored, input_data)
+        if result is not None:
+            return result
+        return self._store(key, await self.graph.ainvoke(input_data, *args, **kwargs))
+
+    async def ainvoke_many(self, inputs: list) -> list:
+        """Grade a list of inputs (each with a "question_id"); returns results
+        in the same order. Exceptions are returned in place of results."""
+        batching = self.config["answer_batching"]
+        # Batched grades are cached apart from single-prompt grades; a
+        # single grade is also stored under the batch key, so batched runs
+        # reuse it (see _store_single)
+        method = "batch" if batching["enabled"] else None
+        results = [None] * len(inputs)
+        keys = {}
+        remaining = []
+        for i, input_data in enumerate(inputs):
+            result, keys[i] = self._fast_path(input_data, method)
+            if result is None:
+                remaining.append(i)
+            results[i] = result
+
+        settled = await asyncio.gather(*[asyncio.to_thread(self._prescored, inputs[i]) for i in remaining])
+        for i, result in zip(remaining, settled):
+            results[i] = result
+        remaining = [i for i in remaining if results[i] is None]
+
+        if batching["enabled"] and len(remaining) > 1:
+            chunks = [remaining[n:n + batching["batch_size"]] for n in range(0, len(remaining), batching["batch_size"])]
+            batched = await asyncio.gather(*[self._grade_batch(inputs, chunk) for chunk in chunks], return_exceptions=True)
+            for chunk, graded in zip(chunks, batched):
+                if isinstance(graded, Exception):
+                    print(f"[WARN] Multi-answer prompt failed for {self.config['name']}: {graded}")
+                    continue
+                for i in chunk:
+                    if i in graded:
+                        results[i] = self._store(keys[i], {**inputs[i], **graded[i]})
+            remaining = [i for i in remaining if results[i] is None]
+
+        fallbacks = await asyncio.gather(*[self.graph.ainvoke(inputs[i]) for i in remaining], return_exceptions=True)
+        for i, result in zip(remaining, fallbacks):
+            results[i] = result if isinstance(result, Exception) else self._store_single(keys[i], inputs[i], result)
+        return results
+
+    def _store_single(self, key: str, input_data: dict, result: dict) -> dict:
+        if not self.config["answer_batching"]["enabled"]:
+            return self._store(key, result)
+        single_key = cache_key(
+            self.config, input_data.get("question"), input_data.get("model_answer"), input_data.get("student_answer")
+        )
+        return self._store(key, result, single_key)
+
+    async def _grade_batch(self, inputs: list, chunk: list) -> dict:
+        items = [{
+            "question_id": inputs[i]["question_id"],
+            "question": inputs[i].get("question"),
+            "model_answer": inputs[i].get("model_answer"),
+            "student_answer": inputs[i].get("student_answer") or "",
+            "reference_ids": inputs[i].get("reference_ids")
+        } for i in chunk]
+        graded = await agrade_batch(self.config, items)
+
+        method = f"{self.config['method']}-batch"
+        by_index = {}
+        for i in chunk:
+            grade = graded.get(inputs[i]["question_id"])
+            if grade is not None:
+                by_index[i] = {**grade, "method": method, "retry_count": 0}
+        return by_index
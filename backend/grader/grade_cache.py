@@ -0,0 +1,134 @@
+# grader/grade_cache.py
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# === Grading result cache ===
+# Cohorts submit the same short answers over and over. Results are cached
+# by module, LLM model, prompt version, grading method (the module's
+# grading_mode, or "batch" for multi-answer prompts), question, model answer
+# and the normalized student answer: a bounded in-memory LRU, optionally backed by
+# a SQLite file shared across restarts (GRADE_CACHE_DB).
+GRADE_CACHE_SIZE = int(os.getenv("GRADE_CACHE_SIZE", 10000))
+GRADE_CACHE_DB = os.getenv("GRADE_CACHE_DB", "")
+
+CACHED_FIELDS = ("score", "feedback", "method", "retry_count")
+
+
+def normalize_answer(answer: str) -> str:
+    answer = re.sub(r"\s+", " ", (answer or "").strip().lower())
+    return answer.rstrip(" .;,")
+
+
+def cache_key(config: dict, question: str, model_answer: str, student_answer: str, method: str = None) -> str:
+    payload = json.dumps([
+        config["key"],
+        config["llm"]["model"],
+        config["prompt_version"],
+        method or config["grading_mode"],
+        question or "",
+        model_answer or "",
+        normalize_answer(student_answer),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GradeCache:
+    def __init__(self, max_size: int = GRADE_CACHE_SIZE, db_path: str = GRADE_CACHE_DB):
+        self.max_size = max_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.read_errors = 0
+        self.write_errors = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS grade_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._db.commit()
+
+    def _remember(self, key: str, result: dict):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return result
+
+            if self._db is not None:
+                # Like a skipped write, a read that loses the lock on the
+                # shared file is a miss: the answer is graded instead
+                try:
+                    row = self._db.execute("SELECT result FROM grade_cache WHERE cache_key = ?", (key,)).fetchone()
+                except sqlite3.OperationalError as e:
+                    row = None
+                    self.read_errors += 1
+                    print(f"[WARN] Grade cache read skipped: {e}")
+                if row:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.disk_hits += 1
+                    return result
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: dict):
+        result = {field: result[field] for field in CACHED_FIELDS if field in result}
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                # The file is shared by the worker processes; a write that
+                # loses the lock is skipped, the grade itself is already done
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO grade_cache (cache_key, result, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(result), time.time())
+                    )
+                    self._db.commit()
+                except sqlite3.OperationalError as e:
+                    self._db.rollback()
+                    self.write_errors += 1
+                    print(f"[WARN] Grade cache write skipped: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "disk_tier": self._db is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "read_errors": self.read_errors,
+                "write_errors": self.write_errors,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+grade_cache = GradeCache()
+
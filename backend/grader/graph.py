@@ -0,0 +1,151 @@
+# grader/graph.py
+
+import time
+import asyncio
+from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
+from typing import TypedDict, Optional
+
+from grader.rag_pipeline import grade_answer, agrade_answer
+from grader.consensus import consensus_grade, aconsensus_grade
+from grader import retry_policy, metrics
+
+# Every node has a sync and an async implementation: graph.invoke() keeps
+# working for scripts, graph.ainvoke() grades on the shared Ollama event
+# loop without holding a thread per job.
+
+# Define state class
+class GraphState(TypedDict):
+    question: str
+    student_answer: str
+    model_answer: str
+    score: Optional[float]
+    feedback: Optional[str]
+    method: Optional[str]
+    retry_count: int
+    samples: Optional[int]
+    spread: Optional[float]
+    confidence: Optional[float]
+    telemetry: Optional[dict]
+    reference_ids: Optional[list]
+    parse_ok: Optional[bool]
+
+# Reflect function: follow the retry policy's decision for the last attempt
+def reflect(state: GraphState) -> str:
+    decision = (state.get("telemetry") or {}).get("decision")
+    if decision and decision["retry"]:
+        return "retry"
+    return "end"
+
+# Refine function: back off if the policy asked for it, increment retry count
+def _refined(state: GraphState) -> GraphState:
+    telemetry = state["telemetry"]
+    backoff = telemetry["decision"]["backoff"]
+    return {
+        **state,
+        "retry_count": state.get("retry_count", 0) + 1,
+        "telemetry": {
+            **telemetry,
+            "retries": telemetry["retries"] + 1,
+            "reasons": telemetry["reasons"] + [telemetry["decision"]["reason"]],
+            "backoff_seconds": telemetry["backoff_seconds"] + backoff
+        }
+    }
+
+def refine(state: GraphState) -> GraphState:
+    backoff = state["telemetry"]["decision"]["backoff"]
+    if backoff:
+        with metrics.stage("retry_backoff"):
+            time.sleep(backoff)
+    return _refined(state)
+
+async def arefine(state: GraphState) -> GraphState:
+    backoff = state["telemetry"]["decision"]["backoff"]
+    if backoff:
+        with metrics.stage("retry_backoff"):
+            await asyncio.sleep(backoff)
+    return _refined(state)
+
+def _require_question(state: GraphState) -> str:
+    question = state.get('question')
+    if not question:
+        raise ValueError("Missing question or student answer in the state: " + str(state))
+    return question
+
+# === Consensus mode: N parallel samples in one node ===
+def build_consensus_graph(config: dict):
+    def consensus_tool(state: GraphState) -> GraphState:
+        question = _require_question(state)
+        result = consensus_grade(config, question, state.get('model_answer') or "", state.get('student_answer') or "", state.get('reference_ids'))
+        return {**state, **result, "retry_count": 0}
+
+    async def aconsensus_tool(state: GraphState) -> GraphState:
+        question = _require_question(state)
+        result = await aconsensus_grade(config, question, state.get('model_answer') or "", state.get('student_answer') or "", state.get('reference_ids'))
+        return {**state, **result, "retry_count": 0}
+
+    builder = StateGraph(GraphState)
+    builder.add_node("consensus", RunnableLambda(consensus_tool, afunc=aconsensus_tool))
+    builder.set_entry_point("consensus")
+    builder.add_edge("consensus", END)
+    return builder.compile()
+
+# === Build one LangGraph per module config ===
+def build_graph(config: dict):
+    if config["grading_mode"] == "consensus":
+        return build_consensus_graph(config)
+
+    policy = retry_policy.get_policy(config)
+    tolerance = config["retry_policy"]["stable_tolerance"]
+
+    def graded(state: GraphState, result: dict, start: float) -> GraphState:
+        seconds = time.perf_counter() - start
+        telemetry = state.get("telemetry") or retry_policy.new_telemetry(start)
+        telemetry = retry_policy.record_attempt(telemetry, result, seconds, tolerance)
+
+        retry, reason, backoff = policy.decide(config, telemetry)
+        telemetry["decision"] = {"retry": retry, "reason": reason, "backoff": backoff}
+        if not retry:
+            retry_policy.finish(config, telemetry)
+
+        # An unreadable attempt keeps the last readable grade, if any, so a
+        # final format failure ends with score None rather than a 0.
+        if result.get("parse_ok", True):
+            grade = {"score": result.get("score"), "feedback": result.get("feedback"), "parse_ok": True}
+        else:
+            grade = {"parse_ok": bool(state.get("parse_ok"))}
+        return {
+            **state,
+            **grade,
+            "method": result.get("method"),
+            "telemetry": telemetry
+        }
+
+    def grading_tool(state: GraphState) -> GraphState:
+        question = _require_question(state)
+        start = time.perf_counter()
+        result = grade_answer(config, question, state.get('model_answer') or "", state.get('student_answer') or "", state.get('reference_ids'))
+        return graded(state, result, start)
+
+    async def agrading_tool(state: GraphState) -> GraphState:
+        question = _require_question(state)
+        start = time.perf_counter()
+        result = await agrade_answer(config, question, state.get('model_answer') or "", state.get('student_answer') or "", state.get('reference_ids'))
+        return graded(state, result, start)
+
+    builder = StateGraph(GraphState)
+    builder.add_node("grade", RunnableLambda(grading_tool, afunc=agrading_tool))
+    builder.add_node("refine", RunnableLambda(refine, afunc=arefine))
+
+    builder.set_entry_point("grade")
+    builder.add_conditional_edges(
+        "grade",
+        reflect,
+        {
+            "retry": "refine",
+            "end": END
+        }
+    )
+    builder.add_edge("refine", "grade")
+
+    return builder.compile()
@@ -0,0 +1,238 @@
+# grader/llm.py
+
+import os
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+from langchain_core.documents import Document
+
+from grader import ollama_client, metrics
+
+# === RAG Prompt ===
+# "legacy" interleaves the student answer with the static parts. "prefix"
+# puts everything a question's answers share first (persona, instructions,
+# response format, references, question, model answer) and the student
+# answer last, so consecutive prompts for one question are byte-identical
+# up to the answer and Ollama reuses the evaluated prefix from its cache.
+
+RESPONSE_TEMPLATES = {
+    "text": "Score: <number>\nFeedback: <your comment>\n",
+    "json": '{"score": <number>, "feedback": "<your comment>"}\n',
+}
+
+
+def generate_prompt(
+    prompt_config: dict,
+    question: str,
+    student_answer: str,
+    model_answer: str,
+    retrieved: List[Document],
+    output_format: str = "text",
+    layout: str = "legacy"
+) -> str:
+    context = "\n---\n".join([doc.page_content for doc in retrieved[:3]])
+    instructions = "\n".join(f"- {line}" for line in prompt_config["instructions"])
+
+    if layout == "prefix":
+        return f"""{prompt_config['persona']}
+
+Instructions:
+{instructions}
+
+{prompt_config['response_format']}
+{RESPONSE_TEMPLATES[output_format]}
+{prompt_config['reference_intro']}
+{context}
+
+{prompt_config['question_intro']}
+
+Question: {question}
+Model Answer (if available): {model_answer or 'N/A'}
+
+Student's Answer:
+\"\"\"{student_answer}\"\"\"
+"""
+
+    return f"""{prompt_config['persona']}
+
+{prompt_config['reference_intro']}
+{context}
+
+{prompt_config['question_intro']}
+
+Question: {question}
+Model Answer (if available): {model_answer or 'N/A'}
+
+Student's Answer:
+\"\"\"{student_answer}\"\"\"
+
+Instructions:
+{instructions}
+
+{prompt_config['response_format']}
+{RESPONSE_TEMPLATES[output_format]}"""
+
+# === Multi-answer prompt (grader/multi_answer.py) ===
+
+def generate_batch_prompt(prompt_config: dict, items: List[dict], retrieved: List[Document], layout: str = "legacy") -> str:
+    context = "\n---\n".join([doc.page_content for doc in retrieved])
+    instructions = "\n".join(f"- {line}" for line in prompt_config["instructions"])
+    answers = "\n\n".join(
+        f"""[question_id: {item['question_id']}]
+Question: {item['question']}
+Model Answer (if available): {item['model_answer'] or 'N/A'}
+Student's Answer:
+\"\"\"{item['student_answer']}\"\"\""""
+        for item in items
+    )
+    response_format = """Respond with a JSON array only, one object per question_id:
+[{"question_id": <question_id>, "score": <number>, "feedback": "<your comment>"}]"""
+
+    if layout == "prefix":
+        return f"""{prompt_config['persona']}
+
+Instructions:
+{instructions}
+
+{response_format}
+
+{prompt_config['reference_intro']}
+{context}
+
+Evaluate each of the student's answers below separately. Grade every answer only against its own question.
+
+{answers}
+"""
+
+    return f"""{prompt_config['persona']}
+
+{prompt_config['reference_intro']}
+{context}
+
+Evaluate each of the student's answers below separately. Grade every answer only against its own question.
+
+{answers}
+
+Instructions:
+{instructions}
+
+Respond with a JSON array only, one object per question_id above:
+[{{"question_id": <question_id>, "score": <number>, "feedback": "<your comment>"}}]
+"""
+
+# === Ollama client ===
+# Requests go through the shared async pool in grader/ollama_client.py; a
+# module may point llm.base_url at its own Ollama host.
+llm_base_url = os.getenv("LLM_BASE_URL", "http://localhost:11434")
+
+
+# model -> [calls, total seconds]; in-flight calls and last latency per model
+_lock = threading.Lock()
+_latency = {}
+_inflight = {}
+_last_latency = {}
+# model -> {"streams", "early_stops", "tokens_generated", "prompt_evals",
+#           "prompt_tokens_evaluated", "prompt_eval_seconds"}
+_generation = {}
+
+
+async def astream_llm(config: dict, prompt: str, stop_when: Optional[Callable[[str], bool]] = None,
+                      num_predict: Optional[int] = None, format: Optional[dict] = None) -> Dict:
+    """Stream a completion, closing the stream as soon as stop_when(text) is true.
+
+    Closing the stream drops the HTTP connection, which makes Ollama stop
+    generating; llm.num_predict caps completions that never satisfy stop_when.
+    """
+    llm_config = config["llm"]
+    model = llm_config["model"]
+    options = {"temperature": llm_config["temperature"]}
+    num_predict = num_predict or llm_config.get("num_predict")
+    if num_predict:
+        options["num_predict"] = num_predict
+
+    with _lock:
+        _inflight[model] = _inflight.get(model, 0) + 1
+    start = time.perf_counter()
+    generation = None
+    try:
+        generation = await ollama_client.generate(
+            llm_config.get("base_url", llm_base_url), model, prompt, options, stop_when, format
+        )
+        return generation
+    finally:
+        elapsed = time.perf_counter() - start
+        queue_seconds = generation["queue_seconds"] if generation is not None else 0.0
+        metrics.record("llm_queue", queue_seconds, config["name"])
+        metrics.record("llm", elapsed - queue_seconds, config["name"])
+        if generation is not None and generation.get("prompt_eval_seconds") is not None:
+            metrics.record("llm_prompt_eval", generation["prompt_eval_seconds"], config["name"])
+        with _lock:
+            _inflight[model] -= 1
+            _last_latency[model] = elapsed
+            totals = _latency.setdefault(model, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+            if generation is not None:
+                counters = _generation.setdefault(model, {
+                    "streams": 0, "early_stops": 0, "tokens_generated": 0,
+                    "prompt_evals": 0, "prompt_tokens_evaluated": 0, "prompt_eval_seconds": 0.0
+                })
+                counters["streams"] += 1
+                counters["early_stops"] += generation["stopped_early"]
+                counters["tokens_generated"] += generation["completion_tokens"]
+                if generation.get("prompt_eval_seconds") is not None:
+                    counters["prompt_evals"] += 1
+                    counters["prompt_tokens_evaluated"] += generation.get("prompt_tokens") or 0
+                    counters["prompt_eval_seconds"] += generation["prompt_eval_seconds"]
+
+
+def stream_llm(config: dict, prompt: str, stop_when: Optional[Callable[[str], bool]] = None, format: Optional[dict] = None) -> Dict:
+    return ollama_client.run_sync(astream_llm(config, prompt, stop_when, format=format))
+
+
+async def acall_llm(config: dict, prompt: str, stop_when: Optional[Callable[[str], bool]] = None, format: Optional[dict] = None) -> str:
+    return (await astream_llm(config, prompt, stop_when, format=format))["text"]
+
+
+def call_llm(config: dict, prompt: str, stop_when: Optional[Callable[[str], bool]] = None, format: Optional[dict] = None) -> str:
+    return stream_llm(config, prompt, stop_when, format)["text"]
+
+
+def generation_stats() -> Dict:
+    with _lock:
+        return {
+            model: {
+                **counters,
+                "prompt_eval_seconds": round(counters["prompt_eval_seconds"], 3),
+                "avg_prompt_eval_ms": (
+                    round(counters["prompt_eval_seconds"] / counters["prompt_evals"] * 1000, 2)
+                    if counters["prompt_evals"] else None
+                ),
+                "avg_prompt_tokens_evaluated": (
+                    round(counters["prompt_tokens_evaluated"] / counters["prompt_evals"], 1)
+                    if counters["prompt_evals"] else None
+                ),
+            }
+            for model, counters in _generation.items()
+        }
+
+
+def average_llm_seconds(model: str):
+    with _lock:
+        calls, seconds = _latency.get(model, (0, 0.0))
+    return seconds / calls if calls else None
+
+
+def inflight(model: str) -> int:
+    with _lock:
+        return _inflight.get(model, 0)
+
+
+def last_latency(model: str):
+    with _lock:
+        return _last_latency.get(model)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for the Llama/Mistral tokenizers
+    return max(1, len(text or "") // 4)
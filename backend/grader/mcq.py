@@ -0,0 +1,86 @@
+# grader/mcq.py
+
+import re
+import threading
+from typing import Dict, Optional
+
+# === Multiple-choice fast path ===
+# Most reference items are "a./b./c./d." questions whose model answer is a
+# single option. Those are scored by exact option matching instead of an
+# embedding search + LLM call.
+OPTION_LINE = re.compile(r"^\s*\(?([a-h])[\.\)]\s+(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+OPTION_ANSWER = re.compile(r"^\s*\(?([a-h])(?:[\.\)]\s*(.*?))?\s*[\.]?\s*$", re.IGNORECASE | re.DOTALL)
+
+METHOD = "mcq-fast-path"
+
+_lock = threading.Lock()
+_counters = {"checked": 0, "handled": 0, "correct": 0, "incorrect": 0, "unmatched_answer": 0}
+
+
+def _count(*names):
+    with _lock:
+        for name in names:
+            _counters[name] += 1
+
+
+def parse_options(question: str) -> Dict[str, str]:
+    options = {letter.lower(): text for letter, text in OPTION_LINE.findall(question or "")}
+    return options if len(options) >= 2 else {}
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower()).rstrip(".")
+
+
+def match_option(answer: str, options: Dict[str, str]) -> Optional[str]:
+    match = OPTION_ANSWER.match(answer or "")
+    if match and match.group(1).lower() in options:
+        letter = match.group(1).lower()
+        text = match.group(2)
+        # "b. INSERT" must agree with option b's text when text is given
+        if not text or _normalize(text) == _normalize(options[letter]):
+            return letter
+
+    normalized = _normalize(answer)
+    by_text = [letter for letter, text in options.items() if _normalize(text) == normalized]
+    return by_text[0] if len(by_text) == 1 else None
+
+
+def grade_mcq(question: str, model_answer: str, student_answer: str) -> Optional[Dict]:
+    _count("checked")
+
+    options = parse_options(question)
+    if not options:
+        return None
+    correct = match_option(model_answer, options)
+    if correct is None:
+        return None
+
+    chosen = match_option(student_answer, options)
+    if chosen is None:
+        # Free-text answer to an MCQ item: let the LLM judge it
+        _count("unmatched_answer")
+        return None
+
+    correct_label = f"{correct}. {options[correct]}"
+    if chosen == correct:
+        _count("handled", "correct")
+        return {
+            "score": 10.0,
+            "feedback": f"Correct. The answer is {correct_label}.",
+            "method": METHOD
+        }
+
+    _count("handled", "incorrect")
+    return {
+        "score": 0.0,
+        "feedback": f"Incorrect. You selected {chosen}. {options[chosen]}; the correct answer is {correct_label}.",
+        "method": METHOD
+    }
+
+
+def stats() -> dict:
+    with _lock:
+        counters = dict(_counters)
+    counters["handled_rate"] = round(counters["handled"] / counters["checked"], 4) if counters["checked"] else 0.0
+    return counters
@@ -0,0 +1,194 @@
+# grader/metrics.py
+#
+# Per-stage timing for grading jobs. A job opens a trace with job(); code
+# along the pipeline wraps its steps in stage("<name>") (or calls record()
+# for durations it measured itself). The trace lives in a contextvar, so it
+# follows the job through awaits, asyncio.to_thread and the graph's nodes.
+# When the job ends its stage totals go into Prometheus-style histograms
+# (rendered by render() for GET /metrics) and one JSON log line:
+#
+#   [INFO] grading_job {"kind": "answer", "module": "...", "status": "ok", "seconds": 1.92, "stages": {...}}
+#
+# Stages timed outside a job are observed directly. Each observation is a
+# perf_counter() pair and a bisect under a lock.
+
+import os
+import json
+import time
+import bisect
+import threading
+import contextvars
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Dict, Optional
+
+GRADING_JOB_LOG = os.getenv("GRADING_JOB_LOG", "1") == "1"
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple = SECONDS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [bucket counts..., sum, count]
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(label) or "") for label in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = ",".join(f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key))
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("grading_stage_seconds", "Time spent per grading stage, per job", ("module", "stage"))
+JOB_SECONDS = Histogram("grading_job_seconds", "End-to-end grading job duration", ("module", "kind", "status"))
+HISTOGRAMS = [STAGE_SECONDS, JOB_SECONDS]
+
+_current = contextvars.ContextVar("grading_trace", default=None)
+_trace_lock = threading.Lock()
+
+
+def current() -> Optional[Dict]:
+    return _current.get()
+
+
+def annotate(**fields):
+    """Attach fields (module, model, method, ...) to the running job's trace."""
+    trace = _current.get()
+    if trace is not None:
+        trace["fields"].update(fields)
+
+
+def record(name: str, seconds: float, module: str = None):
+    trace = _current.get()
+    if trace is None:
+        STAGE_SECONDS.observe(seconds, module=module, stage=name)
+        return
+    with _trace_lock:
+        trace["stages"][name] += seconds
+        trace["counts"][name] += 1
+
+
+@contextmanager
+def stage(name: str, module: str = None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, module)
+
+
+@contextmanager
+def job(kind: str, **fields):
+    """Trace a grading job; nested calls (the queue consumer, then the job
+    handler) share the outer trace."""
+    outer = _current.get()
+    if outer is not None:
+        outer["fields"].update(fields)
+        yield outer
+        return
+
+    trace = {
+        "kind": kind,
+        "fields": dict(fields),
+        "stages": defaultdict(float),
+        "counts": defaultdict(int),
+        "started": time.perf_counter(),
+    }
+    token = _current.set(trace)
+    status = "ok"
+    try:
+        yield trace
+    except BaseException as e:
+        status = "error"
+        trace["fields"].setdefault("error", f"{type(e).__name__}: {e}"[:200])
+        raise
+    finally:
+        _current.reset(token)
+        finish(trace, status)
+
+
+def finish(trace: Dict, status: str):
+    seconds = time.perf_counter() - trace["started"]
+    module = trace["fields"].get("module")
+    with _trace_lock:
+        stages = dict(trace["stages"])
+        counts = dict(trace["counts"])
+    for name, stage_seconds in stages.items():
+        STAGE_SECONDS.observe(stage_seconds, module=module, stage=name)
+    JOB_SECONDS.observe(seconds, module=module, kind=trace["kind"], status=status)
+
+    trace["status"] = status
+    trace["seconds"] = seconds
+    if GRADING_JOB_LOG:
+        print("[INFO] grading_job " + json.dumps({
+            "kind": trace["kind"],
+            **trace["fields"],
+            "status": status,
+            "seconds": round(seconds, 4),
+            "stages": {name: round(value, 4) for name, value in stages.items()},
+            "calls": {name: count for name, count in counts.items() if count > 1},
+        }, default=str))
+
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def serve(port: int, host: str = "0.0.0.0"):
+    """Expose GET /metrics from a process without the FastAPI app (grading workers)."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="grading-metrics", daemon=True).start()
+    return server
@@ -1,24 +1,146 @@
 # backend/grader/model_router.py
-from grader.modules.c_programming.langraph import graph as c_graph
-from grader.modules.database.langgraph import graph as db_graph
-from grader.modules.python_programming.langgraph import graph as python_graph
-from grader.modules.risk_management.langgraph import graph as risk_graph
-from grader.modules.oop_java.langgraph import graph as java_graph
+import os
+import gc
+import time
+import threading
 
-SUPPORTED_MODULES = {
-    "C Programming Module": c_graph,
-    "Database Module": db_graph,
-    "Python Programming": python_graph,
-    "Risk management": risk_graph,
-    "OOP Java Module": java_graph
+from grader import registry
+from grader.embeddings import rss_mb
+
+# Module configs live in grader/registry.py. A module's graph and FAISS
+# index are built on first use and evicted again when idle, so langgraph
+# and faiss are only imported once needed. Ollama requests go through the
+# shared client pool in grader/ollama_client.py.
+
+# 0 disables the corresponding eviction rule
+GRADER_IDLE_TTL_SECONDS = float(os.getenv("GRADER_IDLE_TTL_SECONDS", 1800))
+GRADER_MEMORY_BUDGET_MB = float(os.getenv("GRADER_MEMORY_BUDGET_MB", 0))
+GRADER_PREWARM = [name.strip() for name in os.getenv("GRADER_PREWARM", "").split(",") if name.strip()]
+
+_loaded = {}
+_lock = threading.RLock()
+_load_locks = {}
+_reaper = None
+_stuck_rss_mb = 0.0
+
+
+def _load(module_name: str):
+    config = registry.get_module_config(module_name)
+
+    with _lock:
+        load_lock = _load_locks.setdefault(module_name, threading.Lock())
+
+    with load_lock:
+        with _lock:
+            entry = _loaded.get(module_name)
+        if entry and entry["config"] is config:
+            return entry
+
+        from grader.graph import build_graph
+        from grader.frontend import GradingFrontend
+        from grader.retrieval import get_index
+
+        print(f"[INFO] Loading grader for {module_name}...")
+        start = time.perf_counter()
+        get_index(config)
+        now = time.time()
+        entry = {"graph": GradingFrontend(build_graph(config), config), "config": config, "loaded_at": now, "last_used": now}
+        print(f"[INFO] Loaded grader for {module_name} in {time.perf_counter() - start:.2f}s")
+
+        with _lock:
+            _loaded[module_name] = entry
+        _start_reaper()
+        return entry
+
+
+def evict(module_name: str):
+    with _lock:
+        entry = _loaded.pop(module_name, None)
+    if entry is None:
+        return
+
+    from grader.retrieval import evict as evict_index
+    evict_index(entry["config"])
+    gc.collect()
+    print(f"[INFO] Evicted grader for {module_name}")
+
+
+def _evict_idle(keep: str = None):
+    if GRADER_IDLE_TTL_SECONDS <= 0:
+        return
+    cutoff = time.time() - GRADER_IDLE_TTL_SECONDS
+    with _lock:
+        idle = [name for name, entry in _loaded.items() if name != keep and entry["last_used"] < cutoff]
+    for name in idle:
+        evict(name)
+
+
+def _enforce_memory_budget(keep: str = None):
+    # RSS often doesn't drop after an eviction (the allocator and torch keep
+    # freed arenas), so stop as soon as one doesn't help and leave the rest
+    # loaded until RSS grows past that point again, instead of evicting and
+    # reloading every other module on each request.
+    global _stuck_rss_mb
+    if GRADER_MEMORY_BUDGET_MB <= 0:
+        return
+    rss = rss_mb()
+    if rss <= max(GRADER_MEMORY_BUDGET_MB, _stuck_rss_mb):
+        return
+    while rss > GRADER_MEMORY_BUDGET_MB:
+        with _lock:
+            candidates = sorted(
+                (entry["last_used"], name) for name, entry in _loaded.items() if name != keep
+            )
+        if not candidates:
+            return
+        evict(candidates[0][1])
+        after = rss_mb()
+        if after >= rss - 1:
+            _stuck_rss_mb = after
+            print(f"[WARN] Evicting graders no longer lowers RSS ({after:.0f} MB, budget {GRADER_MEMORY_BUDGET_MB:.0f} MB)")
+            return
+        rss = after
+
+
+def _reap():
+    while True:
+        time.sleep(min(60, GRADER_IDLE_TTL_SECONDS))
+        _evict_idle()
+
+
+def _start_reaper():
+    global _reaper
+    if GRADER_IDLE_TTL_SECONDS <= 0:
+        return
+    with _lock:
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap, name="grader-reaper", daemon=True)
+            _reaper.start()
+
+
+def prewarm(module_names=None):
+    for module_name in module_names if module_names is not None else GRADER_PREWARM:
+        if module_name not in registry.module_names():
+            print(f"[WARN] Cannot pre-warm unknown module: {module_name}")
+            continue
+        _load(module_name)
+
+
+def loaded_modules():
+    with _lock:
+        return {
+            name: {"loaded_at": entry["loaded_at"], "idle_seconds": round(time.time() - entry["last_used"], 1)}
+            for name, entry in _loaded.items()
+        }
 
-}
 
 def route_model(module_name: str):
     print("[DEBUG] Routing module:", module_name)
-    print("[DEBUG] Available modules:", list(SUPPORTED_MODULES.keys()))
+    print("[DEBUG] Available modules:", registry.module_names())
+
+    entry = _load(module_name)
+    entry["last_used"] = time.time()
 
-    if module_name not in SUPPORTED_MODULES:
-        raise ValueError(f"Unsupported module: {module_name}. Supported modules: {list(SUPPORTED_MODULES.keys())}")
-    
-    return SUPPORTED_MODULES[module_name]
\ No newline at end of file
+    _evict_idle(keep=module_name)
+    _enforce_memory_budget(keep=module_name)
+    return entry["graph"]
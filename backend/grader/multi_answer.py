@@ -0,0 +1,124 @@
+# grader/multi_answer.py
+#
+# Multi-answer prompt batching: pack several of one student's answers for
+# the same module into a single prompt (persona, instructions and one
+# shared reference block paid once) and ask for a JSON array of
+# {question_id, score, feedback}, constrained by BATCH_SCHEMA through
+# Ollama's "format" and parsed strictly. Entries that are missing or malformed
+# are graded again one by one through the normal graph. Configured per
+# module:
+#   "answer_batching": {"enabled": true, "batch_size": 5, "references": 5}
+#
+# stats() reports tokens per graded answer for batched prompts next to the
+# single-answer figure from grader/retry_policy.py.
+
+import json
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, List
+
+from grader import retry_policy
+from grader.llm import generate_batch_prompt, astream_llm, estimate_tokens
+from grader.rag_pipeline import GRADE_SCHEMA, record_format, retrieval_query
+from grader.retrieval import retrieve
+from grader import metrics
+
+BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"question_id": {"type": ["integer", "string"]}, **GRADE_SCHEMA["properties"]},
+        "required": ["question_id", *GRADE_SCHEMA["required"]]
+    }
+}
+
+_lock = threading.Lock()
+_stats = defaultdict(lambda: {
+    "prompts": 0,
+    "answers": 0,
+    "graded": 0,
+    "fallbacks": 0,
+    "malformed_responses": 0,
+    "tokens": 0,
+})
+
+
+def build_batch_prompt(config: dict, items: List[dict]) -> str:
+    seen = set()
+    references = []
+    for item in items:
+        # Same references as the single-answer prompt would use
+        query = retrieval_query(config, item.get("question"), item.get("model_answer"), item["student_answer"])
+        for doc in retrieve(config, query, reference_ids=item.get("reference_ids")):
+            if doc.page_content not in seen:
+                seen.add(doc.page_content)
+                references.append(doc)
+    with metrics.stage("prompt", config["name"]):
+        return generate_batch_prompt(
+            config["prompt"], items, references[:config["answer_batching"]["references"]], config["prompt_layout"]
+        )
+
+
+def parse_batch_response(response: str, question_ids: List) -> Dict:
+    """Return {question_id: {"score", "feedback"}} for the valid entries only."""
+    try:
+        entries = json.loads(response)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+
+    wanted = {str(question_id): question_id for question_id in question_ids}
+    graded = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        question_id = wanted.get(str(entry.get("question_id")))
+        score = entry.get("score")
+        feedback = entry.get("feedback")
+        if question_id is None or question_id in graded:
+            continue
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 10:
+            continue
+        if not isinstance(feedback, str) or not feedback.strip():
+            continue
+        graded[question_id] = {"score": float(score), "feedback": feedback.strip()}
+    return graded
+
+
+async def agrade_batch(config: dict, items: List[dict]) -> Dict:
+    """items: [{"question_id", "question", "model_answer", "student_answer", "reference_ids"?}]"""
+    prompt = await asyncio.to_thread(build_batch_prompt, config, items)
+    print(f"[INFO] Calling {config['llm']['model']} for {len(items)} {config['name']} answers...")
+    generation = await astream_llm(config, prompt, num_predict=config["llm"]["num_predict"] * len(items), format=BATCH_SCHEMA)
+    with metrics.stage("parse", config["name"]):
+        graded = parse_batch_response(generation["text"], [item["question_id"] for item in items])
+    record_format(config["llm"]["model"], {"parse_ok": len(graded) == len(items)})
+
+    tokens = (generation.get("prompt_tokens") or estimate_tokens(prompt)) + generation["completion_tokens"]
+    with _lock:
+        module = _stats[config["name"]]
+        module["prompts"] += 1
+        module["answers"] += len(items)
+        module["graded"] += len(graded)
+        module["fallbacks"] += len(items) - len(graded)
+        module["malformed_responses"] += len(graded) < len(items)
+        module["tokens"] += tokens
+    return graded
+
+
+def stats() -> Dict:
+    single = retry_policy.stats()
+    with _lock:
+        report = {}
+        for name, module in _stats.items():
+            report[name] = {
+                **module,
+                "tokens_per_answer_batched": round(module["tokens"] / module["graded"], 1) if module["graded"] else None,
+            }
+    for name, module in single.items():
+        report.setdefault(name, {})["tokens_per_answer_single"] = (
+            round(module["tokens"] / module["jobs"], 1) if module["jobs"] else None
+        )
+    return report
@@ -0,0 +1,190 @@
+# grader/ollama_client.py
+#
+# Asyncio Ollama client shared by every grading module: one pooled
+# keep-alive httpx.AsyncClient, per-host and per-model concurrency limits
+# (granted by the model-affinity scheduler in grader/scheduler.py),
+# timeouts, and queue-depth metrics. It lives on a dedicated
+# event-loop thread so that the FastAPI loop, the grading graphs and plain
+# synchronous callers all share the same connections and limits; a waiting
+# generation costs a coroutine, not an OS thread.
+#
+#   await ollama_client.generate(base_url, model, prompt, options, stop_when, format)
+#   ollama_client.run_sync(coro)     # from synchronous code
+
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from grader.scheduler import HostScheduler
+
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", 64))
+OLLAMA_KEEPALIVE_CONNECTIONS = int(os.getenv("OLLAMA_KEEPALIVE_CONNECTIONS", 16))
+# Per process: with N worker processes a host sees up to N times these
+OLLAMA_HOST_CONCURRENCY = int(os.getenv("OLLAMA_HOST_CONCURRENCY", 8))
+OLLAMA_MODEL_CONCURRENCY = int(os.getenv("OLLAMA_MODEL_CONCURRENCY", 4))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", 5))
+# Longest gap between two streamed chunks (includes model load time)
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", 120))
+# Whole generation including time queued for a slot; 0 disables
+OLLAMA_REQUEST_TIMEOUT = float(os.getenv("OLLAMA_REQUEST_TIMEOUT", 300))
+
+
+class OllamaPool:
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(OLLAMA_READ_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_KEEPALIVE_CONNECTIONS
+            )
+        )
+        self._hosts = {}
+        self.waiting = defaultdict(int)
+        self.running = defaultdict(int)
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.queue_seconds = defaultdict(float)
+
+    def _scheduler(self, base_url: str) -> HostScheduler:
+        if base_url not in self._hosts:
+            self._hosts[base_url] = HostScheduler(OLLAMA_HOST_CONCURRENCY, OLLAMA_MODEL_CONCURRENCY)
+        return self._hosts[base_url]
+
+    async def generate(self, base_url: str, model: str, prompt: str, options: dict,
+                       stop_when: Optional[Callable[[str], bool]] = None, format: Optional[dict] = None) -> Dict:
+        host = self._scheduler(base_url)
+
+        queued = time.perf_counter()
+        self.waiting[model] += 1
+        try:
+            keep_alive = await host.acquire(model)
+        finally:
+            self.waiting[model] -= 1
+        queue_seconds = time.perf_counter() - queued
+        self.queue_seconds[model] += queue_seconds
+
+        self.running[model] += 1
+        self.requests[model] += 1
+        try:
+            generation = await self._stream(base_url, model, prompt, options, keep_alive, stop_when, format)
+            generation["queue_seconds"] = queue_seconds
+            return generation
+        except Exception:
+            self.errors[model] += 1
+            raise
+        finally:
+            self.running[model] -= 1
+            host.release(model)
+
+    async def _stream(self, base_url, model, prompt, options, keep_alive, stop_when, format) -> Dict:
+        payload = {"model": model, "prompt": prompt, "stream": True, "options": options, "keep_alive": keep_alive}
+        if format is not None:
+            # JSON schema: Ollama constrains decoding to matching output
+            payload["format"] = format
+        chunks = []
+        final = {}
+        stopped_early = False
+
+        # Leaving the block early closes the response, which makes Ollama
+        # stop generating.
+        async with self.client.stream("POST", f"{base_url}/api/generate", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if message.get("error"):
+                    raise RuntimeError(f"Ollama error for {model}: {message['error']}")
+                if message.get("response"):
+                    chunks.append(message["response"])
+                if message.get("done"):
+                    final = message
+                    break
+                if stop_when and stop_when("".join(chunks)):
+                    stopped_early = True
+                    break
+
+        return {
+            "text": "".join(chunks),
+            # Ollama streams one token per chunk; eval_count is exact when
+            # the generation ran to completion
+            "completion_tokens": final.get("eval_count", len(chunks)),
+            "prompt_tokens": final.get("prompt_eval_count"),
+            # Only the part of the prompt not already in Ollama's cache is
+            # evaluated; missing when the stream was closed early
+            "prompt_eval_seconds": final["prompt_eval_duration"] / 1e9 if final.get("prompt_eval_duration") else None,
+            "stopped_early": stopped_early
+        }
+
+    def stats(self) -> Dict:
+        models = set(self.requests) | set(self.waiting)
+        return {
+            "hosts": {host: scheduler.stats() for host, scheduler in self._hosts.items()},
+            "models": {
+                model: {
+                    "queue_depth": self.waiting[model],
+                    "running": self.running[model],
+                    "requests": self.requests[model],
+                    "errors": self.errors[model],
+                    "avg_queue_ms": round(self.queue_seconds[model] / self.requests[model] * 1000, 2) if self.requests[model] else 0.0
+                }
+                for model in models
+            },
+            "model_limit": OLLAMA_MODEL_CONCURRENCY
+        }
+
+
+# === Dedicated event loop ===
+_loop = None
+_pool = None
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _pool
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ollama-client", daemon=True).start()
+                _pool = asyncio.run_coroutine_threadsafe(_create_pool(), loop).result()
+                _loop = loop
+    return _loop
+
+
+async def _create_pool() -> OllamaPool:
+    return OllamaPool()
+
+
+async def generate(base_url: str, model: str, prompt: str, options: dict,
+                   stop_when: Optional[Callable[[str], bool]] = None, format: Optional[dict] = None) -> Dict:
+    loop = _get_loop()
+    coro = _pool.generate(base_url, model, prompt, options, stop_when, format)
+    if OLLAMA_REQUEST_TIMEOUT > 0:
+        coro = asyncio.wait_for(coro, OLLAMA_REQUEST_TIMEOUT)
+
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    # Cancelling the caller's task cancels the generation on the client loop
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def run_sync(coro):
+    """Run a coroutine on the client loop from synchronous code and wait for it."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def stats() -> Dict:
+    if _pool is None:
+        return {"hosts": {}, "models": {}, "model_limit": OLLAMA_MODEL_CONCURRENCY}
+    return run_sync(_stats())
+
+
+async def _stats() -> Dict:
+    return _pool.stats()
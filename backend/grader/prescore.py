@@ -0,0 +1,157 @@
+# grader/prescore.py
+#
+# Embedding pre-scoring: compare the student answer with the model answer
+# and settle empty answers without calling Ollama. Similarity-only grades
+# are saved as final (nothing sends them to review), so both similarity
+# bands are opt-in per module: "reject": true scores clearly off-topic
+# answers 0, "accept": true gives near-identical answers full marks.
+# MiniLM similarity stays high for a negated or slightly altered answer, so
+# an accept also needs the same negations and numbers as the model answer.
+# Everything else goes to the LLM. Bands are configured per module ("prescore" in
+# grader/config/modules.json).
+#
+# Replay report over an exported exam:
+#   python -m grader.prescore answers.json [--llm-seconds 8]
+# where answers.json is a list of
+#   {"module", "question", "model_answer", "student_answer"}
+
+import re
+import sys
+import json
+import threading
+from collections import Counter, defaultdict
+from sklearn.metrics.pairwise import cosine_similarity
+from typing import Dict, Optional
+
+from grader.batch_encoder import batch_encoder
+
+BANDS = ("empty", "accepted", "rejected", "ambiguous", "no_model_answer")
+
+NEGATIONS = {"not", "no", "never", "none", "nothing", "neither", "nor", "cannot", "without"}
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'t)?|\d+(?:\.\d+)?")
+
+_lock = threading.Lock()
+_counters = defaultdict(lambda: dict.fromkeys(BANDS, 0))
+
+
+def _count(module_name: str, band: str):
+    with _lock:
+        _counters[module_name][band] += 1
+
+
+def _meaning_markers(text: str) -> Counter:
+    """Negations and numbers: words that flip an answer while barely moving its embedding."""
+    markers = Counter()
+    for token in TOKEN_PATTERN.findall(text.lower().replace("\u2019", "'")):
+        if token.endswith("n't") or token == "cannot":
+            markers["not"] += 1
+        elif token in NEGATIONS or token[0].isdigit():
+            markers[token] += 1
+    return markers
+
+
+def confirms(model_answer: str, student_answer: str) -> bool:
+    return _meaning_markers(model_answer) == _meaning_markers(student_answer)
+
+
+def classify(config: dict, model_answer: str, student_answer: str):
+    if not (student_answer or "").strip():
+        return "empty", None
+    if not (model_answer or "").strip():
+        return "no_model_answer", None
+
+    embeddings = batch_encoder.encode([student_answer, model_answer])
+    similarity = float(cosine_similarity(embeddings[:1], embeddings[1:])[0][0])
+
+    settings = config["prescore"]
+    if similarity >= settings["accept_above"]:
+        if settings["accept"] and confirms(model_answer, student_answer):
+            return "accepted", similarity
+        return "ambiguous", similarity
+    if similarity <= settings["reject_below"] and settings["reject"]:
+        return "rejected", similarity
+    return "ambiguous", similarity
+
+
+def prescore(config: dict, model_answer: str, student_answer: str) -> Optional[Dict]:
+    if not config["prescore"]["enabled"]:
+        return None
+
+    band, similarity = classify(config, model_answer, student_answer)
+    _count(config["name"], band)
+
+    if band == "empty":
+        return {
+            "score": 0.0,
+            "feedback": "No answer provided. Please attempt the question to receive feedback.",
+            "method": "prescore-empty",
+            "provisional": False
+        }
+    if band == "accepted":
+        return {
+            "score": float(config["prescore"]["accept_score"]),
+            "feedback": "Your answer matches the expected answer closely.",
+            "method": "prescore-similarity",
+            "similarity": round(similarity, 4),
+            "provisional": True
+        }
+    if band == "rejected":
+        return {
+            "score": 0.0,
+            "feedback": "Your answer does not address the question. Review the topic and compare with the expected answer.",
+            "method": "prescore-similarity",
+            "similarity": round(similarity, 4),
+            "provisional": True
+        }
+    return None
+
+
+def stats() -> dict:
+    from grader import registry
+    from grader.llm import average_llm_seconds
+
+    report = {}
+    with _lock:
+        counters = {name: dict(bands) for name, bands in _counters.items()}
+
+    for name, bands in counters.items():
+        settled = bands["empty"] + bands["accepted"] + bands["rejected"]
+        total = sum(bands.values())
+        avg = None
+        if name in registry.module_names():
+            avg = average_llm_seconds(registry.get_module_config(name)["llm"]["model"])
+        report[name] = {
+            **bands,
+            "settled_rate": round(settled / total, 4) if total else 0.0,
+            "avg_llm_seconds": round(avg, 3) if avg else None,
+            "estimated_llm_seconds_saved": round(settled * avg, 1) if avg else None,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    from grader import registry
+
+    args = sys.argv[1:]
+    llm_seconds = 8.0
+    if "--llm-seconds" in args:
+        i = args.index("--llm-seconds")
+        llm_seconds = float(args[i + 1])
+        del args[i:i + 2]
+
+    with open(args[0], "r", encoding="utf-8") as file:
+        answers = json.load(file)
+
+    bands = defaultdict(lambda: dict.fromkeys(BANDS, 0))
+    for item in answers:
+        config = registry.get_module_config(item["module"])
+        band, _ = classify(config, item.get("model_answer"), item.get("student_answer"))
+        bands[item["module"]][band] += 1
+
+    total_saved = 0.0
+    for name, counts in bands.items():
+        settled = counts["empty"] + counts["accepted"] + counts["rejected"]
+        total = sum(counts.values())
+        total_saved += settled * llm_seconds
+        print(f"{name}: {counts} -> {settled}/{total} settled without LLM, ~{settled * llm_seconds:.0f}s LLM time saved")
+    print(f"Total estimated LLM time saved: {total_saved:.0f}s at {llm_seconds}s per call")
@@ -0,0 +1,71 @@
+# grader/question_context.py
+#
+# Precomputed retrieval context per question. A question and its model
+# answer don't change after the lecturer saves them, so instead of
+# encoding every student answer and searching FAISS for references, the
+# "question_context" job (backtask/bgtask.py) embeds question + model
+# answer once, keeps the top-k reference rows and the model answer's
+# embedding (db/services/question_context_service.py), and grading looks
+# them up. A context is only used while its content hash (embedding model,
+# module, question, model answer) and the module's corpus hash still
+# match; otherwise grading falls back to per-answer retrieval.
+
+import os
+import json
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional
+
+from grader.batch_encoder import batch_encoder
+from grader.embeddings import EMBEDDING_MODEL_NAME
+from grader.embedding_store import corpus_hash
+from grader import metrics
+
+QUESTION_CONTEXT_K = int(os.getenv("QUESTION_CONTEXT_K", 3))
+
+
+def content_hash(config: dict, question: str, model_answer: str) -> str:
+    payload = json.dumps([EMBEDDING_MODEL_NAME, config["key"], question or "", model_answer or ""])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def query_text(question: str, model_answer: str) -> str:
+    return f"{question or ''}\n{model_answer or ''}"
+
+
+def compute(config: dict, question_id: int, question: str, model_answer: str, k: int = QUESTION_CONTEXT_K) -> Dict:
+    # faiss is only imported by the process that actually computes contexts
+    from grader.retrieval import get_index
+    index, _ = get_index(config)
+    texts = [query_text(question, model_answer)]
+    if (model_answer or "").strip():
+        texts.append(model_answer)
+    embeddings = np.asarray(batch_encoder.encode(texts), dtype="float32")
+    D, I = index.search(embeddings[:1], k=k)
+    return {
+        "question_id": question_id,
+        "module": config["name"],
+        "content_hash": content_hash(config, question, model_answer),
+        "corpus_hash": corpus_hash(config["corpus_path"]),
+        "reference_ids": [int(i) for i in I[0] if i >= 0],
+        "model_answer_embedding": embeddings[1].tobytes() if len(embeddings) > 1 else None,
+    }
+
+
+def resolve(config: dict, question: str, model_answer: str, row: dict) -> Optional[List[int]]:
+    """Reference ids from a questioncontext row (ReferenceIds, ContentHash,
+    CorpusHash, ModelAnswerEmbedding), or None if it is missing or stale.
+    The stored model-answer embedding is handed to the batch encoder so
+    pre-scoring doesn't encode it again."""
+    if not row or not row.get("ReferenceIds"):
+        return None
+    with metrics.stage("context_lookup", config["name"]):
+        if row["ContentHash"] != content_hash(config, question, model_answer):
+            return None
+        if row["CorpusHash"] != corpus_hash(config["corpus_path"]):
+            return None
+
+        if row.get("ModelAnswerEmbedding") and (model_answer or "").strip():
+            batch_encoder.remember([model_answer], np.frombuffer(row["ModelAnswerEmbedding"], dtype="float32")[None, :])
+        ids = row["ReferenceIds"]
+        return json.loads(ids) if isinstance(ids, (str, bytes)) else list(ids)
@@ -0,0 +1,179 @@
+# grader/rag_pipeline.py
+
+from grader.llm import generate_prompt, stream_llm, astream_llm, estimate_tokens
+from grader.retrieval import retrieve
+from grader.question_context import query_text
+from grader import metrics
+from collections import defaultdict
+from typing import Dict
+import threading
+import asyncio
+import json
+import re
+
+NO_ANSWER_FEEDBACK = "No answer provided. Please attempt the question to receive feedback."
+
+
+def retrieval_query(config: dict, question_text: str, model_answer: str, student_answer: str) -> str:
+    # The prefix layout needs the same references for every answer to a
+    # question, so without precomputed ones it retrieves by the question
+    # and model answer instead of the student answer.
+    if config["prompt_layout"] == "prefix":
+        return query_text(question_text, model_answer)
+    return student_answer
+
+
+def build_prompt(config: dict, question_text: str, model_answer: str, student_answer: str, reference_ids: list = None) -> str:
+    query = retrieval_query(config, question_text, model_answer, student_answer)
+    retrieved = retrieve(config, query, reference_ids=reference_ids)
+    with metrics.stage("prompt", config["name"]):
+        return generate_prompt(
+            config["prompt"], question_text, student_answer, model_answer, retrieved,
+            config["output_format"], config["prompt_layout"]
+        )
+
+
+# Sent as Ollama's "format" for modules with "output_format": "json", so the
+# model is constrained to exactly this object instead of free text
+GRADE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "feedback": {"type": "string"}
+    },
+    "required": ["score", "feedback"]
+}
+
+_format_lock = threading.Lock()
+_format_stats = defaultdict(lambda: {"responses": 0, "format_failures": 0})
+
+
+# An unreadable response is not a grade: no score, so callers retry it or
+# treat the answer as failed instead of saving a 0.
+UNPARSED = {"score": None, "feedback": None, "parse_ok": False}
+
+SCORE_PATTERN = re.compile(r"score[:=]?\s*(\d+(\.\d+)?)")
+
+
+def response_complete(text: str) -> bool:
+    # Both fields are complete once a score has been seen and a non-empty
+    # Feedback line has been terminated by a newline.
+    if not SCORE_PATTERN.search(text.lower()):
+        return False
+    finished_lines = text.split("\n")[:-1]
+    return any(
+        line.lower().startswith("feedback") and line.split(":", 1)[-1].strip()
+        for line in finished_lines
+    )
+
+
+def parse_json_response(response: str) -> Dict:
+    try:
+        data = json.loads(response)
+    except json.JSONDecodeError:
+        data = None
+    score = data.get("score") if isinstance(data, dict) else None
+    feedback = data.get("feedback") if isinstance(data, dict) else None
+
+    valid = (
+        isinstance(score, (int, float)) and not isinstance(score, bool) and 0 <= score <= 10
+        and isinstance(feedback, str) and bool(feedback.strip())
+    )
+    if not valid:
+        return dict(UNPARSED)
+    return {"score": float(score), "feedback": feedback.strip(), "parse_ok": True}
+
+
+def parse_response(response: str, output_format: str = "text") -> Dict:
+    if output_format == "json":
+        return parse_json_response(response)
+
+    # Parse score + feedback
+    match = SCORE_PATTERN.search(response.lower())
+    lines = response.strip().split("\n")
+    feedback_line = next((l for l in lines if l.lower().startswith("feedback")), None)
+    feedback = feedback_line.split(":", 1)[1].strip() if feedback_line else ""
+    if not match or not feedback:
+        return dict(UNPARSED)
+
+    return {
+        "score": float(match.group(1)),
+        "feedback": feedback,
+        "parse_ok": True
+    }
+
+def record_format(model: str, parsed: Dict) -> Dict:
+    with _format_lock:
+        stats = _format_stats[model]
+        stats["responses"] += 1
+        stats["format_failures"] += not parsed["parse_ok"]
+    return parsed
+
+
+def format_stats() -> Dict:
+    with _format_lock:
+        return {
+            model: {
+                **stats,
+                "format_failure_rate": round(stats["format_failures"] / stats["responses"], 4) if stats["responses"] else 0.0
+            }
+            for model, stats in _format_stats.items()
+        }
+
+
+def generation_options(config: dict) -> Dict:
+    """stop_when/format for stream_llm: JSON mode lets Ollama enforce the
+    schema and end the object itself; text mode stops once both lines are in."""
+    if config["output_format"] == "json":
+        return {"stop_when": None, "format": GRADE_SCHEMA}
+    return {"stop_when": response_complete, "format": None}
+
+
+# === Master Function ===
+
+def _no_answer(method: str) -> Dict:
+    return {
+        "score": 0.0,
+        "feedback": NO_ANSWER_FEEDBACK,
+        "method": method,
+        "parse_ok": True,
+        "tokens": 0,
+        "completion_tokens": 0
+    }
+
+
+def _graded(config: dict, prompt: str, generation: Dict) -> Dict:
+    prompt_tokens = generation.get("prompt_tokens") or estimate_tokens(prompt)
+    with metrics.stage("parse", config["name"]):
+        parsed = parse_response(generation["text"], config["output_format"])
+    return {
+        **record_format(config["llm"]["model"], parsed),
+        "method": config["method"],
+        "tokens": prompt_tokens + generation["completion_tokens"],
+        "completion_tokens": generation["completion_tokens"]
+    }
+
+
+def grade_answer(config: dict, question_text: str, model_answer: str, student_answer: str, reference_ids: list = None) -> Dict:
+    method = config["method"]
+
+    if not student_answer.strip():
+        return _no_answer(method)
+
+    prompt = build_prompt(config, question_text, model_answer, student_answer, reference_ids)
+    print(f"[INFO] Calling {config['llm']['model']} for {config['name']}...")
+    generation = stream_llm(config, prompt, **generation_options(config))
+    return _graded(config, prompt, generation)
+
+
+async def agrade_answer(config: dict, question_text: str, model_answer: str, student_answer: str, reference_ids: list = None) -> Dict:
+    method = config["method"]
+
+    if not student_answer.strip():
+        return _no_answer(method)
+
+    # Retrieval is CPU-bound (embedding + FAISS); keep it off the event loop
+    prompt = await asyncio.to_thread(build_prompt, config, question_text, model_answer, student_answer, reference_ids)
+    print(f"[INFO] Calling {config['llm']['model']} for {config['name']}...")
+    generation = await astream_llm(config, prompt, **generation_options(config))
+    return _graded(config, prompt, generation)
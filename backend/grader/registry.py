@@ -0,0 +1,234 @@
+# grader/registry.py
+
+import os
+import json
+import copy
+import time
+import hashlib
+import threading
+from typing import Dict, List
+
+# Every grading module is one entry in grader/config/modules.json: its
+# prompt text, Ollama model, reference corpus and FAISS index path. The
+# grading engine itself (retrieval, LLM client pool, caches) is shared.
+GRADER_MODULES_CONFIG = os.getenv("GRADER_MODULES_CONFIG", os.path.join("grader", "config", "modules.json"))
+# Modules registered at runtime are persisted to GRADER_MODULES_CONFIG as
+# given (defaults are filled in on load, so changing a default or
+# GRADER_PROMPT_LAYOUT still applies to saved modules); other processes (backtask/worker.py, the grader service) reload the file
+# when its mtime changes, checked at most this often and always before a
+# module is reported as unsupported.
+GRADER_MODULES_RELOAD_SECONDS = float(os.getenv("GRADER_MODULES_RELOAD_SECONDS", 5))
+
+REQUIRED_FIELDS = ("name", "key", "corpus_path", "index_path", "llm", "prompt")
+
+# Bump when the prompt template in grader/llm.py changes; it is part of
+# every module's prompt_version and therefore of the grade cache key.
+PROMPT_TEMPLATE_VERSION = 3
+
+# "json": ask Ollama for schema-constrained JSON and parse it strictly
+# "text": the original "Score: / Feedback:" lines parsed with a regex
+OUTPUT_FORMATS = ("json", "text")
+
+# Prompt layout (see generate_prompt in grader/llm.py): "prefix" keeps the
+# student answer last so prompts for one question share a cacheable prefix
+PROMPT_LAYOUTS = ("prefix", "legacy")
+GRADER_PROMPT_LAYOUT = os.getenv("GRADER_PROMPT_LAYOUT", "prefix")
+
+# Cap on generated tokens per LLM call; "Score: n" plus one feedback line
+# fits comfortably, rambling past it is cut off.
+DEFAULT_NUM_PREDICT = 256
+
+DEFAULT_PROMPT = {
+    "reference_intro": "Use the reference below to help evaluate the answer:",
+    "question_intro": "Evaluate the student's answer to the following question ONLY:",
+    "response_format": "Respond in this exact format:",
+}
+
+# Embedding pre-scoring bands (see grader/prescore.py); cosine similarity
+# between the student answer and the model answer. Full marks ("accept")
+# and zero ("reject") without the LLM are opt-in per module.
+DEFAULT_PRESCORE = {
+    "enabled": True,
+    "accept": False,
+    "accept_above": 0.92,
+    "reject": False,
+    "reject_below": 0.15,
+    "accept_score": 10.0,
+}
+
+# "retry": grade -> refine -> grade loop (grader/graph.py)
+# "consensus": parallel self-consistency samples (grader/consensus.py)
+GRADING_MODES = ("retry", "consensus")
+
+DEFAULT_CONSENSUS = {
+    "samples": 3,
+    "min_agree": 2,
+    "tolerance": 1.0,
+}
+
+# Several answers per prompt with JSON output (see grader/multi_answer.py);
+# used when a whole exam is graded at once.
+DEFAULT_ANSWER_BATCHING = {
+    "enabled": False,
+    "batch_size": 5,
+    "references": 5,
+}
+
+# Retry policy for the "retry" grading mode (see grader/retry_policy.py).
+# "budget": retry parse failures within a per-job time/token budget
+# "legacy": the original loop, retry any score below 4 up to 3 times
+RETRY_POLICIES = ("budget", "legacy")
+
+# A budget of 0 means unlimited.
+DEFAULT_RETRY_POLICY = {
+    "policy": "budget",
+    "max_retries": 3,
+    "time_budget_seconds": 60.0,
+    "token_budget": 0,
+    "retry_low_score": False,
+    "low_score_threshold": 4.0,
+    "stable_tolerance": 1.0,
+    "saturation_inflight": 4,
+    "saturation_latency_seconds": 30.0,
+    "saturation_backoff_seconds": 2.0,
+}
+
+_modules: Dict[str, dict] = {}
+# Configs as written in GRADER_MODULES_CONFIG, before normalize_config
+_raw_configs: Dict[str, dict] = {}
+_lock = threading.Lock()
+_loaded_mtime = None
+_checked_at = 0.0
+
+
+def normalize_config(config: dict) -> dict:
+    missing = [field for field in REQUIRED_FIELDS if not config.get(field)]
+    if missing:
+        raise ValueError(f"Module config is missing fields: {missing}")
+
+    config = copy.deepcopy(config)
+    if not config["llm"].get("model"):
+        raise ValueError(f"Module config for {config['name']} is missing llm.model")
+    if not config["prompt"].get("persona") or not config["prompt"].get("instructions"):
+        raise ValueError(f"Module config for {config['name']} needs prompt.persona and prompt.instructions")
+
+    config["prompt"] = {**DEFAULT_PROMPT, **config["prompt"]}
+    config["llm"].setdefault("temperature", 0.8)
+    config["llm"].setdefault("num_predict", DEFAULT_NUM_PREDICT)
+    config["prescore"] = {**DEFAULT_PRESCORE, **config.get("prescore", {})}
+    config.setdefault("output_format", "json")
+    if config["output_format"] not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format '{config['output_format']}' for {config['name']}")
+    config.setdefault("prompt_layout", GRADER_PROMPT_LAYOUT)
+    if config["prompt_layout"] not in PROMPT_LAYOUTS:
+        raise ValueError(f"Unknown prompt_layout '{config['prompt_layout']}' for {config['name']}")
+    config.setdefault("grading_mode", "retry")
+    if config["grading_mode"] not in GRADING_MODES:
+        raise ValueError(f"Unknown grading_mode '{config['grading_mode']}' for {config['name']}")
+    config["consensus"] = {**DEFAULT_CONSENSUS, **config.get("consensus", {})}
+    if not 1 <= config["consensus"]["min_agree"] <= config["consensus"]["samples"]:
+        raise ValueError(f"consensus.min_agree must be between 1 and consensus.samples for {config['name']}")
+    config["answer_batching"] = {**DEFAULT_ANSWER_BATCHING, **config.get("answer_batching", {})}
+    if config["answer_batching"]["batch_size"] < 1:
+        raise ValueError(f"answer_batching.batch_size must be at least 1 for {config['name']}")
+    config["retry_policy"] = {**DEFAULT_RETRY_POLICY, **config.get("retry_policy", {})}
+    if config["retry_policy"]["policy"] not in RETRY_POLICIES:
+        raise ValueError(f"Unknown retry_policy.policy '{config['retry_policy']['policy']}' for {config['name']}")
+    config.setdefault("method", f"{config['llm']['model'].split(':')[0]}-rag")
+
+    prompt_source = json.dumps(
+        [PROMPT_TEMPLATE_VERSION, config["output_format"], config["prompt_layout"], config["prompt"]], sort_keys=True
+    )
+    config["prompt_version"] = hashlib.sha256(prompt_source.encode("utf-8")).hexdigest()[:12]
+    return config
+
+
+def register_module(config: dict, persist: bool = True) -> dict:
+    raw = copy.deepcopy(config)
+    config = normalize_config(config)
+
+    with _lock:
+        for name, existing in _modules.items():
+            if existing["key"] == config["key"] and name != config["name"]:
+                raise ValueError(f"Module key '{config['key']}' is already used by {name}")
+        _modules[config["name"]] = config
+        _raw_configs[config["name"]] = raw
+
+        if persist:
+            _save_locked()
+
+    print(f"[INFO] Registered grading module: {config['name']} ({config['llm']['model']})")
+    return config
+
+
+def _mtime(path: str):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _save_locked(path: str = None):
+    global _loaded_mtime
+    path = path or GRADER_MODULES_CONFIG
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(list(_raw_configs.values()), file, indent=4)
+    os.replace(tmp_path, path)
+    _loaded_mtime = _mtime(path)
+
+
+def load_modules(path: str = None):
+    global _loaded_mtime
+    path = path or GRADER_MODULES_CONFIG
+    mtime = _mtime(path)
+    with open(path, "r", encoding="utf-8") as file:
+        configs = json.load(file)
+    for config in configs:
+        # Unchanged modules keep their config object, so graders already
+        # loaded for them (grader/model_router.py) stay valid
+        if _modules.get(config.get("name")) != normalize_config(config):
+            register_module(config, persist=False)
+        else:
+            _raw_configs[config["name"]] = copy.deepcopy(config)
+    _loaded_mtime = mtime
+
+
+def reload_if_changed(force: bool = False) -> bool:
+    """Reload GRADER_MODULES_CONFIG if another process rewrote it."""
+    global _checked_at
+    now = time.monotonic()
+    if not force and now - _checked_at < GRADER_MODULES_RELOAD_SECONDS:
+        return False
+    _checked_at = now
+
+    mtime = _mtime(GRADER_MODULES_CONFIG)
+    if mtime is None or mtime == _loaded_mtime:
+        return False
+    try:
+        load_modules()
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not reload {GRADER_MODULES_CONFIG}: {e}")
+        return False
+    return True
+
+
+def get_module_config(module_name: str) -> dict:
+    reload_if_changed()
+    config = _modules.get(module_name)
+    if config is None and reload_if_changed(force=True):
+        config = _modules.get(module_name)
+    if config is None:
+        raise ValueError(f"Unsupported module: {module_name}. Supported modules: {module_names()}")
+    return config
+
+
+def module_names() -> List[str]:
+    return list(_modules.keys())
+
+
+def all_modules() -> List[dict]:
+    return list(_modules.values())
+
+
+load_modules()
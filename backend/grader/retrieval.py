@@ -0,0 +1,79 @@
+# grader/retrieval.py
+
+import os
+import threading
+import faiss
+import numpy as np
+from typing import List
+from langchain_core.documents import Document
+
+from grader.build_indexes import check_index, stale_index_error
+from grader.corpus import CompiledCorpus, compiled_corpus_path, load_corpus, evict as evict_corpus
+from grader.embedding_store import corpus_hash, read_manifest
+from grader.batch_encoder import batch_encoder
+from grader import metrics
+
+# === Shared retrieval stack ===
+# One FAISS index + compiled reference corpus per module key, reused until the
+# module's corpus hash changes or the module is evicted. Indexes are built
+# offline by grader/build_indexes.py and memory-mapped read-only here, so
+# every worker on a box shares the same pages.
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+_index_cache = {}
+_lock = threading.Lock()
+
+
+def _open_index(config: dict, corpus: CompiledCorpus):
+    problems = check_index(config)
+    if problems:
+        raise stale_index_error(config, problems)
+
+    print(f"[INFO] Opening FAISS index {config['index_path']} (mmap, read-only)")
+    index = faiss.read_index(config["index_path"], MMAP_FLAGS)
+
+    manifest = read_manifest(os.path.dirname(config["index_path"]))
+    if index.ntotal != len(corpus) or index.d != manifest.get("dimension"):
+        raise stale_index_error(config, ["index does not match the compiled corpus"])
+    return index
+
+
+def get_index(config: dict):
+    key = config["key"]
+    digest = corpus_hash(config["corpus_path"])
+
+    cached = _index_cache.get(key)
+    if cached and cached[0] == digest:
+        return cached[1], cached[2]
+
+    with _lock:
+        cached = _index_cache.get(key)
+        if cached and cached[0] == digest:
+            return cached[1], cached[2]
+
+        print(f"[INFO] Loading reference corpus for {config['name']}...")
+        with metrics.stage("load_corpus", config["name"]):
+            corpus = load_corpus(config["corpus_path"], compiled_corpus_path(config))
+            index = _open_index(config, corpus)
+        _index_cache[key] = (digest, index, corpus)
+        return index, corpus
+
+
+def retrieve(config: dict, student_answer: str, k: int = 3, reference_ids: List[int] = None) -> List[Document]:
+    """Top-k references for the student answer, or the question's
+    precomputed reference rows (grader/question_context.py) if given."""
+    index, corpus = get_index(config)
+    if reference_ids:
+        return [corpus.document(i) for i in reference_ids if 0 <= i < len(corpus)]
+
+    with metrics.stage("embed", config["name"]):
+        student_embedding = batch_encoder.encode([student_answer])
+    with metrics.stage("index_search", config["name"]):
+        D, I = index.search(np.array(student_embedding), k=k)
+    return [corpus.document(i) for i in I[0] if i >= 0]
+
+
+def evict(config: dict):
+    with _lock:
+        _index_cache.pop(config["key"], None)
+    evict_corpus(compiled_corpus_path(config))
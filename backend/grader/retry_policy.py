@@ -0,0 +1,195 @@
+# grader/retry_policy.py
+#
+# Decides, after every LLM attempt in the "retry" grading mode, whether the
+# grade -> refine -> grade loop calls the model again. The "budget" policy
+# retries answers the parser could not read, stops once two attempts agree
+# on a low score (the answer is simply weak), gives up when the job runs
+# out of time or tokens, and backs off instead of piling more requests on
+# an Ollama host that is already saturated. Configured per module:
+#   "retry_policy": {"policy": "budget", "max_retries": 3, "time_budget_seconds": 60, ...}
+#
+# Every job carries a telemetry dict through the graph state (attempts,
+# retries and why, LLM latency added by retries, tokens); finished jobs are
+# logged on one line and aggregated per module in stats().
+
+import time
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Tuple
+
+from grader.llm import inflight, last_latency
+
+
+def new_telemetry(started: float = None) -> Dict:
+    return {
+        "started": started or time.perf_counter(),
+        "attempts": 0,
+        "retries": 0,
+        "reasons": [],
+        "scores": [],
+        "parse_failures": 0,
+        "tokens": 0,
+        "completion_tokens": 0,
+        "llm_seconds": 0.0,
+        "retry_seconds": 0.0,
+        "backoff_seconds": 0.0,
+        "wasted_calls": 0,
+        "decision": None,
+    }
+
+
+def record_attempt(telemetry: Dict, result: Dict, seconds: float, tolerance: float) -> Dict:
+    telemetry = {**telemetry, "reasons": list(telemetry["reasons"]), "scores": list(telemetry["scores"])}
+    parsed = result.get("parse_ok", True)
+
+    # A retry that lands within tolerance of the previous readable score
+    # changed nothing: that call was wasted.
+    readable = [s for s in telemetry["scores"] if s is not None]
+    if telemetry["attempts"] and parsed and readable and abs(result["score"] - readable[-1]) <= tolerance:
+        telemetry["wasted_calls"] += 1
+
+    telemetry["attempts"] += 1
+    telemetry["scores"].append(result.get("score") if parsed else None)
+    telemetry["parse_failures"] += 0 if parsed else 1
+    telemetry["tokens"] += result.get("tokens", 0)
+    telemetry["completion_tokens"] += result.get("completion_tokens", 0)
+    telemetry["llm_seconds"] += seconds
+    if telemetry["attempts"] > 1:
+        telemetry["retry_seconds"] += seconds
+    return telemetry
+
+
+class RetryPolicy:
+    def __init__(self, settings: dict):
+        self.settings = settings
+
+    def decide(self, config: dict, telemetry: Dict) -> Tuple[bool, str, float]:
+        """Return (retry, reason, backoff_seconds) for the latest attempt."""
+        raise NotImplementedError
+
+
+class LegacyRetryPolicy(RetryPolicy):
+    def decide(self, config, telemetry):
+        score = telemetry["scores"][-1]
+        score = 0.0 if score is None else score
+        if score >= 4:
+            return False, "accepted", 0.0
+        if telemetry["retries"] >= 3:
+            return False, "retry_limit", 0.0
+        return True, "low_score", 0.0
+
+
+class BudgetRetryPolicy(RetryPolicy):
+    def decide(self, config, telemetry):
+        settings = self.settings
+        score = telemetry["scores"][-1]
+
+        if score is None:
+            reason = "parse_failure"
+        elif score < settings["low_score_threshold"] and settings["retry_low_score"]:
+            earlier = [s for s in telemetry["scores"][:-1] if s is not None]
+            if any(abs(score - s) <= settings["stable_tolerance"] for s in earlier):
+                return False, "stable_low_score", 0.0
+            reason = "low_score"
+        else:
+            return False, "accepted", 0.0
+
+        if telemetry["retries"] >= settings["max_retries"]:
+            return False, "retry_limit", 0.0
+
+        elapsed = time.perf_counter() - telemetry["started"]
+        time_budget = settings["time_budget_seconds"]
+        if time_budget and elapsed + telemetry["llm_seconds"] / telemetry["attempts"] > time_budget:
+            return False, "time_budget", 0.0
+
+        token_budget = settings["token_budget"]
+        if token_budget and telemetry["tokens"] + telemetry["tokens"] / telemetry["attempts"] > token_budget:
+            return False, "token_budget", 0.0
+
+        if self._saturated(config["llm"]["model"]):
+            # A low score is a usable grade; only unreadable output is worth
+            # queueing behind a busy host, and then only after a pause.
+            backoff = settings["saturation_backoff_seconds"]
+            if reason != "parse_failure" or (time_budget and elapsed + backoff > time_budget):
+                return False, "saturated", 0.0
+            return True, reason, backoff
+
+        return True, reason, 0.0
+
+    def _saturated(self, model: str) -> bool:
+        settings = self.settings
+        if settings["saturation_inflight"] and inflight(model) >= settings["saturation_inflight"]:
+            return True
+        latency = last_latency(model)
+        return bool(settings["saturation_latency_seconds"]) and latency is not None and latency >= settings["saturation_latency_seconds"]
+
+
+POLICIES = {
+    "budget": BudgetRetryPolicy,
+    "legacy": LegacyRetryPolicy,
+}
+
+
+def get_policy(config: dict) -> RetryPolicy:
+    settings = config["retry_policy"]
+    return POLICIES[settings["policy"]](settings)
+
+
+# === Per-module telemetry ===
+_lock = threading.Lock()
+_stats = defaultdict(lambda: {
+    "jobs": 0,
+    "llm_calls": 0,
+    "retries": 0,
+    "wasted_calls": 0,
+    "parse_failures": 0,
+    "tokens": 0,
+    "completion_tokens": 0,
+    "retry_seconds": 0.0,
+    "backoff_seconds": 0.0,
+    "retry_reasons": Counter(),
+    "stop_reasons": Counter(),
+})
+
+
+def finish(config: dict, telemetry: Dict):
+    stop_reason = telemetry["decision"]["reason"]
+    with _lock:
+        module = _stats[config["name"]]
+        module["jobs"] += 1
+        module["llm_calls"] += telemetry["attempts"]
+        module["retries"] += telemetry["retries"]
+        module["wasted_calls"] += telemetry["wasted_calls"]
+        module["parse_failures"] += telemetry["parse_failures"]
+        module["tokens"] += telemetry["tokens"]
+        module["completion_tokens"] += telemetry["completion_tokens"]
+        module["retry_seconds"] += telemetry["retry_seconds"]
+        module["backoff_seconds"] += telemetry["backoff_seconds"]
+        module["retry_reasons"].update(telemetry["reasons"])
+        module["stop_reasons"][stop_reason] += 1
+
+    print(
+        f"[INFO] Graded {config['name']}: attempts={telemetry['attempts']} retries={telemetry['retries']} "
+        f"reasons={','.join(telemetry['reasons']) or '-'} stop={stop_reason} "
+        f"wasted={telemetry['wasted_calls']} tokens={telemetry['tokens']} "
+        f"generated={telemetry['completion_tokens']} "
+        f"retry_latency={telemetry['retry_seconds'] + telemetry['backoff_seconds']:.2f}s "
+        f"total={time.perf_counter() - telemetry['started']:.2f}s"
+    )
+
+
+def stats() -> Dict:
+    with _lock:
+        report = {}
+        for name, module in _stats.items():
+            calls = module["llm_calls"]
+            report[name] = {
+                **module,
+                "retry_reasons": dict(module["retry_reasons"]),
+                "stop_reasons": dict(module["stop_reasons"]),
+                "retry_seconds": round(module["retry_seconds"], 3),
+                "backoff_seconds": round(module["backoff_seconds"], 3),
+                "llm_calls_per_job": round(calls / module["jobs"], 3) if module["jobs"] else 0.0,
+                "wasted_call_rate": round(module["wasted_calls"] / calls, 3) if calls else 0.0,
+            }
+        return report
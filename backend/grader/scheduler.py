@@ -0,0 +1,163 @@
+# grader/scheduler.py
+#
+# Model-affinity scheduling for one Ollama host, as seen from one process:
+# slots, queues and limits are per process, so N worker processes
+# (backtask/worker.py) sharing a host can run N times the configured
+# concurrency against it. Every module grades with a
+# different multi-GB model, and a host serving requests in arrival order
+# keeps unloading one model to load the next. The scheduler hands free
+# slots to waiting requests for the model the host is already running and
+# only switches when that model has no more queued work, or after
+# `fairness_cap` consecutive grants while other models wait, so that no
+# module starves. "fifo" keeps plain arrival order (for comparison).
+#
+# Both orders are counted: `model_switches` is what the host actually did,
+# `arrival_order_switches` is what serving requests as they arrived would
+# have done.
+
+import os
+import asyncio
+import itertools
+from collections import deque
+from typing import Dict, Optional
+
+OLLAMA_SCHEDULER = os.getenv("OLLAMA_SCHEDULER", "affinity")
+OLLAMA_FAIRNESS_CAP = int(os.getenv("OLLAMA_FAIRNESS_CAP", 16))
+# Ollama keep_alive for the model being drained. Only when this process is
+# the host's sole client (OLLAMA_SOLE_CLIENT=1) does the last queued request
+# of a model it is switching away from get OLLAMA_KEEP_ALIVE_RELEASE (unload
+# right away to make room for the next one); otherwise other processes may
+# still be using that model, so it stays loaded.
+OLLAMA_KEEP_ALIVE_ACTIVE = os.getenv("OLLAMA_KEEP_ALIVE_ACTIVE", "30m")
+OLLAMA_KEEP_ALIVE_RELEASE = os.getenv("OLLAMA_KEEP_ALIVE_RELEASE", "0")
+OLLAMA_SOLE_CLIENT = os.getenv("OLLAMA_SOLE_CLIENT", "0") == "1"
+
+SCHEDULERS = ("affinity", "fifo")
+
+
+class HostScheduler:
+    """Grants request slots on one Ollama host. Only used from its event loop."""
+
+    def __init__(self, slots: int, model_limit: int, policy: str = OLLAMA_SCHEDULER, fairness_cap: int = OLLAMA_FAIRNESS_CAP,
+                 sole_client: bool = OLLAMA_SOLE_CLIENT):
+        if policy not in SCHEDULERS:
+            raise ValueError(f"Unknown OLLAMA_SCHEDULER '{policy}', expected one of {SCHEDULERS}")
+        self.slots = slots
+        self.model_limit = model_limit
+        self.policy = policy
+        self.fairness_cap = fairness_cap
+        self.sole_client = sole_client
+
+        self.free = slots
+        self.queues: Dict[str, deque] = {}
+        self.running: Dict[str, int] = {}
+        self._arrivals = itertools.count()
+
+        self.active: Optional[str] = None
+        self.streak = 0
+        self.model_switches = 0
+        self.fairness_switches = 0
+        self._last_arrival_model: Optional[str] = None
+        self.arrival_order_switches = 0
+
+    async def acquire(self, model: str) -> str:
+        """Wait for a slot; returns the keep_alive hint for the request."""
+        if self._last_arrival_model is not None and model != self._last_arrival_model:
+            self.arrival_order_switches += 1
+        self._last_arrival_model = model
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(model, deque()).append((next(self._arrivals), waiter))
+        self._dispatch()
+
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted and cancelled in the same tick: give the slot back
+                self.release(model)
+            else:
+                self._forget(model, waiter)
+            raise
+
+    def release(self, model: str):
+        self.free += 1
+        self.running[model] -= 1
+        self._dispatch()
+
+    def queue_depth(self, model: str) -> int:
+        return len(self.queues.get(model, ()))
+
+    def _forget(self, model: str, waiter):
+        queue = self.queues.get(model)
+        if queue is None:
+            return
+        self.queues[model] = deque(entry for entry in queue if entry[1] is not waiter)
+        if not self.queues[model]:
+            del self.queues[model]
+
+    def _eligible(self):
+        return [model for model in self.queues if self.running.get(model, 0) < self.model_limit]
+
+    def _pick(self) -> Optional[str]:
+        eligible = self._eligible()
+        if not eligible:
+            return None
+
+        def oldest(models):
+            return min(models, key=lambda model: self.queues[model][0][0])
+
+        if self.policy == "fifo":
+            return oldest(eligible)
+
+        others = [model for model in eligible if model != self.active]
+        if self.active in self.queues:
+            if self.streak < self.fairness_cap or not others:
+                # Stay on the loaded model; if it is at its concurrency
+                # limit, wait for one of its slots rather than switch.
+                return self.active if self.active in eligible else None
+            self.fairness_switches += 1
+        return oldest(others) if others else None
+
+    def _dispatch(self):
+        while self.free > 0:
+            model = self._pick()
+            if model is None:
+                return
+
+            _, waiter = self.queues[model].popleft()
+            if not self.queues[model]:
+                del self.queues[model]
+            if waiter.cancelled():
+                continue
+
+            if model != self.active:
+                if self.active is not None:
+                    self.model_switches += 1
+                self.active = model
+                self.streak = 0
+            self.streak += 1
+
+            self.free -= 1
+            self.running[model] = self.running.get(model, 0) + 1
+            waiter.set_result(self._keep_alive(model))
+
+    def _keep_alive(self, model: str) -> str:
+        if self.sole_client and self.policy == "affinity" and model not in self.queues and self.queues:
+            return OLLAMA_KEEP_ALIVE_RELEASE
+        return OLLAMA_KEEP_ALIVE_ACTIVE
+
+    def stats(self) -> Dict:
+        return {
+            "policy": self.policy,
+            "slots": self.slots,
+            "available": self.free,
+            "active_model": self.active,
+            "active_streak": self.streak,
+            "fairness_cap": self.fairness_cap,
+            "sole_client": self.sole_client,
+            "model_switches": self.model_switches,
+            "fairness_switches": self.fairness_switches,
+            "arrival_order_switches": self.arrival_order_switches,
+            "queue_depth": {model: len(queue) for model, queue in self.queues.items()},
+        }
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from api.auth_routes import router as auth_router
 from api.lecturer_routes import router as lecturer_router
@@ -6,6 +6,12 @@ from api.admin_routes import router as admin_router
 from api.student_routes import router as student_router
 from api.student_exam_routes import router as student_exam_router
 from api.student_result_routes import router as student_result_router
+import os
+from grader.build_indexes import verify_indexes
+from grader.model_router import prewarm
+from backtask.job_queue import start_workers, stop_workers
+from grader import metrics
+from db.services import grading_job_service, grading_trace_service, question_context_service
 
 app = FastAPI()
 
@@ -27,4 +33,42 @@ app.include_router(lecturer_router)
 app.include_router(admin_router)
 app.include_router(student_router)
 app.include_router(student_exam_router)
-app.include_router(student_result_router)
\ No newline at end of file
+app.include_router(student_result_router)
+
+# Grading stage histograms (grader/metrics.py) for Prometheus, for jobs
+# graded in this process (GRADING_API_WORKERS > 0). Worker processes serve
+# their own on GRADING_METRICS_PORT + i; in docker-compose that is
+# grader:9100, 9101, ... while the API grades nothing.
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Refuse to start on stale/missing indexes (build them with
+# python -m grader.build_indexes). Graders load on first use;
+# GRADER_PREWARM lists modules to load up front.
+@app.on_event("startup")
+def prewarm_graders():
+    if os.getenv("GRADER_VERIFY_INDEXES", "1") == "1":
+        verify_indexes()
+    prewarm()
+
+# Lecturer edits enqueue jobs and clear questioncontext rows before any
+# worker may have run, so the API creates the grading tables too.
+@app.on_event("startup")
+def ensure_grading_tables():
+    for service in (grading_job_service, grading_trace_service, question_context_service):
+        try:
+            service.ensure_table()
+        except Exception as e:
+            print(f"[WARN] Could not create grading tables: {e}")
+
+# The API only enqueues grading jobs; python -m backtask.worker consumes
+# them. GRADING_API_WORKERS > 0 also runs consumers in this process (for
+# single-process development setups).
+@app.on_event("startup")
+async def start_grading_workers():
+    await start_workers(int(os.getenv("GRADING_API_WORKERS", 0)))
+
+@app.on_event("shutdown")
+async def stop_grading_workers():
+    await stop_workers()
@@ -1,6 +1,8 @@
 # test_grader.py
 
-from grader.modules.c_programming.langraph import graph
+from grader.model_router import route_model
+
+graph = route_model("C Programming Module")
 
 samples = [
     {
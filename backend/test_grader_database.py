@@ -1,4 +1,6 @@
-from grader.modules.database.langgraph import graph
+from grader.model_router import route_model
+
+graph = route_model("Database Module")
 
 
 samples = [
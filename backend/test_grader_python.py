@@ -1,4 +1,6 @@
-from grader.modules.python_programming.langgraph import graph
+from grader.model_router import route_model
+
+graph = route_model("Python Programming")
 
 # Sample questions with model answers and student answers (theory and code)
 samples = [
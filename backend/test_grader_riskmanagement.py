@@ -1,4 +1,6 @@
-from grader.modules.risk_management.langgraph import graph
+from grader.model_router import route_model
+
+graph = route_model("Risk management")
 
 # === Sample Risk Management Questions and Student Answers ===
 samples = [
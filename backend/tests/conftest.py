@@ -0,0 +1,22 @@
+# Unit tests that need no Ollama, MySQL or embedding model. Run from
+# backend/ (grader/registry.py loads grader/config/modules.json relative
+# to it):
+#   python -m pytest
+
+import pytest
+
+from grader import registry
+
+
+@pytest.fixture
+def config():
+    return registry.normalize_config({
+        "name": "Test Module",
+        "key": "test",
+        "corpus_path": "data/dbms_questions.json",
+        "index_path": "indexes/test_index",
+        "llm": {"model": "test-model"},
+        "prompt": {"persona": "You are a strict examiner.", "instructions": "Grade the answer out of 10."},
+        "prescore": {"enabled": False},
+        "retry_policy": {"time_budget_seconds": 0, "saturation_inflight": 0, "saturation_latency_seconds": 0},
+    })
@@ -0,0 +1,11 @@
+import sys
+import subprocess
+
+HEAVY = ("faiss", "sklearn", "torch", "sentence_transformers", "langgraph")
+
+
+def test_api_import_stays_light():
+    # A fresh interpreter: other tests import the grading stack themselves
+    code = f"import sys, main; print([m for m in {HEAVY!r} if m in sys.modules])"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from backtask import bgtask
+from grader import consensus, registry
+
+
+@pytest.fixture
+def consensus_config(config):
+    return registry.normalize_config({**config, "grading_mode": "consensus"})
+
+
+def _samples(monkeypatch, texts):
+    texts = list(texts)
+
+    async def acall_llm(config, prompt, **options):
+        return texts.pop(0)
+
+    monkeypatch.setattr(consensus, "acall_llm", acall_llm)
+    monkeypatch.setattr(consensus, "build_prompt", lambda *args: "prompt")
+
+
+def test_consensus_without_readable_samples_has_no_score(monkeypatch, consensus_config):
+    _samples(monkeypatch, ['{"score": 7', "not json", '{"feedback": "x"}'])
+
+    result = asyncio.run(consensus.aconsensus_grade(consensus_config, "Q", "M", "A"))
+
+    assert result["score"] is None
+    assert result["confidence"] == 0.0
+
+
+def test_consensus_ignores_malformed_samples(monkeypatch, consensus_config):
+    _samples(monkeypatch, ['{"score": 6, "feedback": "ok"}', "garbage", '{"score": 6.5, "feedback": "fine"}'])
+
+    result = asyncio.run(consensus.aconsensus_grade(consensus_config, "Q", "M", "A"))
+
+    assert result["score"] == 6.25
+    assert result["samples"] == 2
+
+
+def test_answer_job_without_score_fails_instead_of_saving(monkeypatch, consensus_config):
+    saved = []
+
+    class Graph:
+        config = consensus_config
+
+        async def ainvoke(self, input_data):
+            return {**input_data, "score": None, "feedback": None, "method": "test-rag-consensus"}
+
+    monkeypatch.setattr(bgtask.student_service, "get_question_with_model_answer",
+                        lambda question_id: {"QuestionName": "Q", "ModelAnswer": "M"})
+    monkeypatch.setattr(bgtask.student_service, "get_module_name_by_exam_id", lambda exam_id: "Test Module")
+    monkeypatch.setattr(bgtask.student_service, "update_student_answer", lambda **kwargs: saved.append(kwargs))
+    monkeypatch.setattr(bgtask, "route_model", lambda module_name: Graph())
+
+    with pytest.raises(RuntimeError, match="No grade"):
+        asyncio.run(bgtask.process_grading({
+            "user_id": 1, "exam_id": 2, "question_id": 3, "studentAnswer": "A", "is_finalized": True, "question_mark": 10
+        }))
+    assert saved == []
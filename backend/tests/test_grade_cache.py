@@ -0,0 +1,72 @@
+import asyncio
+import sqlite3
+
+from grader.frontend import GradingFrontend
+from grader.grade_cache import GradeCache
+
+INPUT = {"question": "What does a foreign key do?", "model_answer": "It references another table's key.",
+         "student_answer": "It links two tables."}
+
+
+class ScriptedGraph:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def ainvoke(self, input_data, *args, **kwargs):
+        self.calls += 1
+        return {**input_data, **self.results.pop(0)}
+
+
+def test_unparsed_result_not_cached(config):
+    graph = ScriptedGraph([
+        {"score": 0.0, "feedback": "No feedback.", "parse_ok": False},
+        {"score": None, "feedback": None, "parse_ok": False},
+        {"score": 7.0, "feedback": "Good.", "parse_ok": True},
+    ])
+    frontend = GradingFrontend(graph, config, cache=GradeCache(db_path=""))
+
+    first = asyncio.run(frontend.ainvoke(INPUT))
+    second = asyncio.run(frontend.ainvoke(INPUT))
+    third = asyncio.run(frontend.ainvoke(INPUT))
+    cached = asyncio.run(frontend.ainvoke(INPUT))
+
+    assert not first.get("cached") and not second.get("cached") and not third.get("cached")
+    assert third["score"] == 7.0
+    assert cached["cached"] and cached["score"] == 7.0
+    assert graph.calls == 3
+
+
+def test_locked_disk_tier_skips_write(tmp_path):
+    path = str(tmp_path / "grades.db")
+    cache = GradeCache(db_path=path)
+    cache._db = sqlite3.connect(path, timeout=0, check_same_thread=False)
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        cache.put("key", {"score": 5.0, "feedback": "ok"})
+    finally:
+        other.rollback()
+        other.close()
+
+    assert cache.stats()["write_errors"] == 1
+    assert cache.get("key") == {"score": 5.0, "feedback": "ok"}
+
+
+def test_locked_disk_tier_read_is_a_miss(tmp_path):
+    path = str(tmp_path / "grades.db")
+    GradeCache(db_path=path).put("key", {"score": 5.0, "feedback": "ok"})
+    cache = GradeCache(db_path=path)
+    cache._db = sqlite3.connect(path, timeout=0, check_same_thread=False)
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        assert cache.get("key") is None
+    finally:
+        other.rollback()
+        other.close()
+
+    assert cache.stats()["read_errors"] == 1 and cache.stats()["misses"] == 1
+    assert cache.get("key") == {"score": 5.0, "feedback": "ok"}
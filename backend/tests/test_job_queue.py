@@ -0,0 +1,139 @@
+import json
+import asyncio
+
+from backtask import job_queue
+from db.services import grading_job_service
+
+
+class FakeCursor:
+    def __init__(self, selects):
+        self.selects = list(selects)
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.selects.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self, dictionary=False):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+def _job(job_id, model="mistral:7b", attempts=0):
+    return {"JobId": job_id, "Kind": "answer", "Payload": json.dumps({"question_id": job_id}),
+            "ModuleName": "Database Module", "Model": model, "Attempts": attempts, "MaxAttempts": 5}
+
+
+def _claim(monkeypatch, selects, *args, **kwargs):
+    cursor = FakeCursor(selects)
+    conn = FakeConnection(cursor)
+    monkeypatch.setattr(grading_job_service, "get_connection", lambda: conn)
+    jobs = grading_job_service.claim_jobs(*args, **kwargs)
+    return jobs, cursor.statements, conn
+
+
+def test_claim_scans_expired_then_preferred_model(monkeypatch):
+    jobs, statements, conn = _claim(monkeypatch, [[], [], [_job(7, attempts=1)]], "w-0", 1, 120, prefer_model="mistral:7b")
+
+    selects = [sql for sql, _ in statements if sql.startswith("SELECT")]
+    assert len(selects) == 3
+    assert "LeaseExpiresAt < NOW(3) AND Attempts >= MaxAttempts" in selects[0]
+    assert "LeaseExpiresAt < NOW(3) AND Attempts < MaxAttempts" in selects[1]
+    assert "Model = %s" in selects[2] and statements[2][1][0] == "mistral:7b"
+    assert all("<=>" not in sql and "FOR UPDATE SKIP LOCKED" in sql for sql in selects)
+
+    update, params = statements[-1]
+    assert update.startswith("UPDATE gradingjob SET Status = 'running'")
+    assert params == ("w-0", 120_000_000, 7)
+    assert conn.commits == 1
+    assert jobs[0]["Payload"] == {"question_id": 7} and jobs[0]["Attempts"] == 2
+
+
+def test_claim_fills_limit_without_reclaiming_own_rows(monkeypatch):
+    selects = [[], [_job(1)], [_job(2)], [_job(3, model="llama3:8b")]]
+    jobs, statements, _ = _claim(
+        monkeypatch, selects, "w-0", 3, 60, prefer_model="mistral:7b", modules=["Database Module"]
+    )
+
+    assert [job["JobId"] for job in jobs] == [1, 2, 3]
+    plain, params = statements[3]
+    assert "Model = %s" not in plain
+    assert "ModuleName IN (%s)" in plain and "JobId NOT IN (%s, %s)" in plain
+    assert params == ("Database Module", 1, 2, 1)
+
+
+def test_claim_without_jobs_leases_nothing(monkeypatch):
+    jobs, statements, conn = _claim(monkeypatch, [[], [], []], "w-0", 1, 60)
+
+    assert jobs == []
+    assert not any(sql.startswith("UPDATE") for sql, _ in statements)
+    assert conn.commits == 1
+
+
+def test_claim_dead_letters_jobs_that_expired_on_their_last_attempt(monkeypatch):
+    crashed = _job(4, attempts=5)
+    jobs, statements, conn = _claim(monkeypatch, [[crashed], [], [_job(5)]], "w-0", 1, 60)
+
+    assert [job["JobId"] for job in jobs] == [5]
+    dead_letter, params = statements[1]
+    assert dead_letter.startswith("UPDATE gradingjob SET Status = 'dead'")
+    assert "LastError" in dead_letter and params == (4,)
+    assert conn.commits == 1
+
+
+def test_lease_renewal_survives_transient_errors(monkeypatch):
+    outcomes = [ConnectionError("MySQL went away"), True, False]
+    calls = []
+
+    def extend_lease(job_id, worker_id, lease_seconds):
+        calls.append(job_id)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(job_queue, "GRADING_LEASE_SECONDS", 0.03)
+    monkeypatch.setattr(grading_job_service, "extend_lease", extend_lease)
+
+    asyncio.run(asyncio.wait_for(job_queue.GradingWorkerPool(1)._renew_lease("w-0", 9), 5))
+
+    assert calls == [9, 9, 9]
+
+
+def test_model_affinity_is_capped(monkeypatch):
+    monkeypatch.setattr(job_queue, "GRADING_AFFINITY_MAX_CLAIMS", 2)
+    pool = job_queue.GradingWorkerPool(1)
+    preferred = []
+
+    def claim_jobs(worker_id, limit, lease_seconds, prefer_model, modules):
+        preferred.append(prefer_model)
+        if len(preferred) == 6:
+            pool._stopping.set()
+        return [_job(len(preferred))]
+
+    async def run(worker_id, job):
+        pass
+
+    monkeypatch.setattr(grading_job_service, "claim_jobs", claim_jobs)
+    monkeypatch.setattr(pool, "_run", run)
+
+    asyncio.run(pool._consume("w-0"))
+
+    assert preferred == [None, "mistral:7b", "mistral:7b", None, "mistral:7b", "mistral:7b"]
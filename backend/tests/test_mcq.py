@@ -0,0 +1,41 @@
+import pytest
+
+from grader.mcq import grade_mcq, parse_options, match_option, METHOD
+
+QUESTION = ("Which SQL keyword is used to specify that a new record should be added to a database table?\n"
+            "a. INTO\nb. INSERT\nc. VALUES\nd. ADD")
+
+
+def test_options_parsed():
+    assert parse_options(QUESTION) == {"a": "INTO", "b": "INSERT", "c": "VALUES", "d": "ADD"}
+
+
+def test_free_text_question_is_not_mcq():
+    assert parse_options("Explain 3NF in database normalization.") == {}
+    assert grade_mcq("Explain 3NF in database normalization.", "It removes transitive dependencies.", "b") is None
+
+
+@pytest.mark.parametrize("answer", ["b", "B.", "(b)", "b) insert", "b. INSERT", "insert", " Insert. "])
+def test_correct_option_forms(answer):
+    result = grade_mcq(QUESTION, "b. INSERT", answer)
+    assert result["score"] == 10.0 and result["method"] == METHOD
+
+
+def test_wrong_option_scores_zero():
+    result = grade_mcq(QUESTION, "b. INSERT", "c")
+    assert result["score"] == 0.0
+    assert "the correct answer is b. INSERT" in result["feedback"]
+
+
+@pytest.mark.parametrize("answer", [
+    "b. VALUES",                               # letter and text disagree
+    "You use INSERT INTO to add a row",        # free text goes to the LLM
+    "e",                                       # not an option
+])
+def test_ambiguous_answers_left_to_llm(answer):
+    assert grade_mcq(QUESTION, "b. INSERT", answer) is None
+
+
+def test_unmatched_model_answer_left_to_llm():
+    assert grade_mcq(QUESTION, "INSERT INTO table VALUES (...)", "b") is None
+    assert match_option("z", parse_options(QUESTION)) is None
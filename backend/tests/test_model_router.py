@@ -0,0 +1,46 @@
+from grader import model_router
+
+
+def _loaded(monkeypatch, names, rss):
+    evicted = []
+    monkeypatch.setattr(model_router, "GRADER_MEMORY_BUDGET_MB", 1000)
+    monkeypatch.setattr(model_router, "_stuck_rss_mb", 0.0)
+    monkeypatch.setattr(model_router, "_loaded", {name: {"last_used": i} for i, name in enumerate(names)})
+    monkeypatch.setattr(model_router, "rss_mb", lambda: rss[0])
+
+    def evict(name):
+        evicted.append(name)
+        model_router._loaded.pop(name)
+    monkeypatch.setattr(model_router, "evict", evict)
+    return evicted
+
+
+def test_eviction_stops_when_rss_does_not_drop(monkeypatch):
+    rss = [1500]
+    evicted = _loaded(monkeypatch, ["a", "b", "c", "d"], rss)
+
+    model_router._enforce_memory_budget(keep="d")
+    assert evicted == ["a"]
+
+    # Routing again at the same RSS doesn't evict another module
+    model_router._enforce_memory_budget(keep="c")
+    assert evicted == ["a"]
+
+    # Growth past the stuck point tries again
+    rss[0] = 1700
+    model_router._enforce_memory_budget(keep="d")
+    assert evicted == ["a", "b"]
+
+
+def test_eviction_continues_while_rss_drops(monkeypatch):
+    rss = [1500]
+    evicted = _loaded(monkeypatch, ["a", "b", "c", "d"], rss)
+
+    def evict(name):
+        evicted.append(name)
+        model_router._loaded.pop(name)
+        rss[0] -= 300
+    monkeypatch.setattr(model_router, "evict", evict)
+
+    model_router._enforce_memory_budget(keep="d")
+    assert evicted == ["a", "b"]
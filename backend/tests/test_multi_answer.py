@@ -0,0 +1,56 @@
+import asyncio
+
+from langchain_core.documents import Document
+
+from grader import multi_answer, registry
+from grader.frontend import GradingFrontend
+from grader.grade_cache import GradeCache
+
+QUESTION = "What does a foreign key enforce?"
+MODEL_ANSWER = "Referential integrity between two tables."
+
+
+def test_batch_prompt_retrieves_like_single_prompt(config, monkeypatch):
+    queries = []
+
+    def retrieve(config, query, reference_ids=None):
+        queries.append(query)
+        return [Document(page_content=f"reference for {query!r}")]
+    monkeypatch.setattr(multi_answer, "retrieve", retrieve)
+
+    config = registry.normalize_config({**config, "prompt_layout": "prefix"})
+    items = [{"question_id": i, "question": QUESTION, "model_answer": MODEL_ANSWER, "student_answer": answer}
+             for i, answer in enumerate(["It links tables.", "Referential integrity"])]
+    multi_answer.build_batch_prompt(config, items)
+
+    assert len(set(queries)) == 1
+    assert QUESTION in queries[0] and "links" not in queries[0]
+
+
+class CountingGraph:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, input_data, *args, **kwargs):
+        self.calls += 1
+        return {**input_data, "score": 6.0, "feedback": "Single.", "parse_ok": True}
+
+
+def test_batch_grades_not_served_to_single_prompts(config, monkeypatch):
+    async def agrade_batch(config, items):
+        return {item["question_id"]: {"score": 9.0, "feedback": "Batch."} for item in items}
+    monkeypatch.setattr("grader.frontend.agrade_batch", agrade_batch)
+
+    config = registry.normalize_config({**config, "answer_batching": {"enabled": True}})
+    graph = CountingGraph()
+    frontend = GradingFrontend(graph, config, cache=GradeCache(db_path=""))
+    inputs = [{"question_id": i, "question": f"Q{i}", "model_answer": MODEL_ANSWER, "student_answer": "An answer."}
+              for i in range(2)]
+
+    batched = asyncio.run(frontend.ainvoke_many(inputs))
+    single = asyncio.run(frontend.ainvoke(inputs[0]))
+    again = asyncio.run(frontend.ainvoke_many(inputs))
+
+    assert [result["score"] for result in batched] == [9.0, 9.0]
+    assert single["score"] == 6.0 and not single.get("cached") and graph.calls == 1
+    assert all(result.get("cached") for result in again)
@@ -0,0 +1,65 @@
+import json
+import asyncio
+
+from grader import graph as graph_module
+from grader.graph import build_graph
+from grader.rag_pipeline import parse_response, parse_json_response
+
+
+def test_json_response_parsed():
+    parsed = parse_json_response(json.dumps({"score": 7, "feedback": " Good. "}))
+    assert parsed == {"score": 7.0, "feedback": "Good.", "parse_ok": True}
+
+
+def test_malformed_json_has_no_score():
+    for response in ('{"score": 7, "feedb', '{"score": 11, "feedback": "x"}', '{"score": true, "feedback": "x"}',
+                     '{"score": 5, "feedback": "  "}', '[1, 2]', ''):
+        parsed = parse_json_response(response)
+        assert parsed["parse_ok"] is False
+        assert parsed["score"] is None
+
+
+def test_text_response_parsed():
+    parsed = parse_response("Score: 6.5\nFeedback: Mostly right.\n", "text")
+    assert parsed == {"score": 6.5, "feedback": "Mostly right.", "parse_ok": True}
+
+
+def test_text_response_without_score_or_feedback_has_no_score():
+    for response in ("Grade: 6\nFeedback: ok\n", "Score: 6\n", "Score: 6\nFeedback:\n"):
+        parsed = parse_response(response, "text")
+        assert parsed["parse_ok"] is False
+        assert parsed["score"] is None
+
+
+def _attempts(monkeypatch, results):
+    calls = []
+
+    async def agrade_answer(*args):
+        calls.append(args)
+        return results[min(len(calls), len(results)) - 1]
+
+    monkeypatch.setattr(graph_module, "agrade_answer", agrade_answer)
+    return calls
+
+
+def test_final_parse_failure_is_not_a_zero_grade(monkeypatch, config):
+    unparsed = {"score": None, "feedback": None, "parse_ok": False, "method": "test-rag", "tokens": 10, "completion_tokens": 5}
+    calls = _attempts(monkeypatch, [unparsed])
+
+    state = asyncio.run(build_graph(config).ainvoke({"question": "Q", "student_answer": "A", "model_answer": "M"}))
+
+    assert len(calls) == config["retry_policy"]["max_retries"] + 1
+    assert state["telemetry"]["reasons"] == ["parse_failure"] * config["retry_policy"]["max_retries"]
+    assert state.get("score") is None
+    assert not state["parse_ok"]
+
+
+def test_parse_failure_retried_until_readable(monkeypatch, config):
+    unparsed = {"score": None, "feedback": None, "parse_ok": False, "method": "test-rag", "tokens": 10, "completion_tokens": 5}
+    graded = {"score": 8.0, "feedback": "Good.", "parse_ok": True, "method": "test-rag", "tokens": 10, "completion_tokens": 5}
+    calls = _attempts(monkeypatch, [unparsed, graded])
+
+    state = asyncio.run(build_graph(config).ainvoke({"question": "Q", "student_answer": "A", "model_answer": "M"}))
+
+    assert len(calls) == 2
+    assert (state["score"], state["feedback"], state["parse_ok"]) == (8.0, "Good.", True)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from grader import prescore, registry
+
+MODEL_ANSWER = "A primary key can contain NULL values and must be unique in 2 columns."
+
+
+class IdenticalEncoder:
+    """Every text embeds to the same vector: similarity 1.0, like MiniLM
+    on a near-copy of the model answer."""
+
+    def encode(self, texts):
+        return np.ones((len(texts), 4), dtype="float32")
+
+
+@pytest.fixture(autouse=True)
+def identical_embeddings(monkeypatch):
+    monkeypatch.setattr(prescore, "batch_encoder", IdenticalEncoder())
+
+
+@pytest.fixture
+def accepting_config(config):
+    return registry.normalize_config({**config, "prescore": {"enabled": True, "accept": True}})
+
+
+def test_accept_path_off_by_default(config):
+    config = registry.normalize_config({**config, "prescore": {"enabled": True}})
+    assert prescore.prescore(config, MODEL_ANSWER, MODEL_ANSWER) is None
+
+
+@pytest.mark.parametrize("student_answer", [
+    "A primary key cannot contain NULL values and must be unique in 2 columns.",
+    "A primary key can't contain NULL values and must be unique in 2 columns.",
+    "A primary key can contain NULL values and must not be unique in 2 columns.",
+    "A primary key can contain NULL values and must be unique in 3 columns.",
+])
+def test_negated_or_altered_answer_not_auto_accepted(accepting_config, student_answer):
+    assert prescore.classify(accepting_config, MODEL_ANSWER, student_answer)[0] == "ambiguous"
+    assert prescore.prescore(accepting_config, MODEL_ANSWER, student_answer) is None
+
+
+def test_matching_answer_accepted_when_enabled(accepting_config):
+    result = prescore.prescore(accepting_config, MODEL_ANSWER, "a primary key can contain null values, must be unique in 2 columns")
+    assert result["method"] == "prescore-similarity"
+    assert result["score"] == accepting_config["prescore"]["accept_score"]
+
+
+def test_reject_path_off_by_default(config, monkeypatch):
+    class UnrelatedEncoder:
+        def encode(self, texts):
+            return np.eye(len(texts), 4, dtype="float32")
+
+    monkeypatch.setattr(prescore, "batch_encoder", UnrelatedEncoder())
+    config = registry.normalize_config({**config, "prescore": {"enabled": True}})
+    assert prescore.classify(config, MODEL_ANSWER, "Paris is in France.")[0] == "ambiguous"
+
+    config = registry.normalize_config({**config, "prescore": {"enabled": True, "reject": True}})
+    assert prescore.prescore(config, MODEL_ANSWER, "Paris is in France.")["score"] == 0.0
+
+
+def test_markers_treat_contractions_as_not():
+    assert prescore.confirms("It is not stored.", "It isn’t stored")
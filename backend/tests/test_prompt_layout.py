@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from langchain_core.documents import Document
+
+from grader import rag_pipeline, registry
+
+QUESTION = "What does a foreign key enforce?"
+MODEL_ANSWER = "Referential integrity between two tables."
+ANSWERS = ["It links tables.", "Referential integrity", "Something about primary keys and indexes, I think."]
+
+
+@pytest.fixture(autouse=True)
+def query_dependent_references(monkeypatch):
+    # References depend on the retrieval query, like a FAISS search would
+    def retrieve(config, query, reference_ids=None):
+        return [Document(page_content=f"reference for {query!r} #{i}") for i in range(3)]
+    monkeypatch.setattr(rag_pipeline, "retrieve", retrieve)
+
+
+def _prompts(config, layout):
+    config = registry.normalize_config({**config, "prompt_layout": layout})
+    return [rag_pipeline.build_prompt(config, QUESTION, MODEL_ANSWER, answer) for answer in ANSWERS]
+
+
+def test_prefix_layout_differs_only_after_shared_prefix(config):
+    prompts = _prompts(config, "prefix")
+    prefix = os.path.commonprefix(prompts)
+
+    assert prefix.endswith("Student's Answer:\n\"\"\"")
+    for prompt, answer in zip(prompts, ANSWERS):
+        assert prompt == f"{prefix}{answer}\"\"\"\n"
+    assert "reference for" in prefix and QUESTION in prefix and MODEL_ANSWER in prefix
+
+
+def test_prefix_layout_is_byte_stable(config):
+    first = [prompt.encode("utf-8") for prompt in _prompts(config, "prefix")]
+    again = [prompt.encode("utf-8") for prompt in _prompts(config, "prefix")]
+    assert first == again
+
+
+def test_legacy_layout_retrieves_per_answer(config):
+    prompts = _prompts(config, "legacy")
+    prefix = os.path.commonprefix(prompts)
+    # References differ per answer, so prompts diverge before the question
+    assert QUESTION not in prefix
+
+
+def test_layout_is_part_of_prompt_version(config):
+    prefix = registry.normalize_config({**config, "prompt_layout": "prefix"})
+    legacy = registry.normalize_config({**config, "prompt_layout": "legacy"})
+    assert prefix["prompt_version"] != legacy["prompt_version"]
@@ -0,0 +1,66 @@
+import os
+import json
+
+import pytest
+
+from grader import registry
+
+
+@pytest.fixture
+def modules_file(tmp_path, monkeypatch):
+    path = tmp_path / "modules.json"
+    with open(registry.GRADER_MODULES_CONFIG, "r", encoding="utf-8") as file:
+        path.write_text(file.read())
+    monkeypatch.setattr(registry, "GRADER_MODULES_CONFIG", str(path))
+    monkeypatch.setattr(registry, "_modules", dict(registry._modules))
+    monkeypatch.setattr(registry, "_raw_configs", dict(registry._raw_configs))
+    monkeypatch.setattr(registry, "_loaded_mtime", os.path.getmtime(path))
+    return path
+
+
+def test_module_written_by_another_process_is_found(modules_file, config):
+    existing = registry.get_module_config("Database Module")
+    configs = json.loads(modules_file.read_text())
+    configs.append({k: v for k, v in config.items() if k != "prompt_version"})
+    modules_file.write_text(json.dumps(configs))
+    os.utime(modules_file, (0, os.path.getmtime(modules_file) + 10))
+
+    assert registry.get_module_config("Test Module")["llm"]["model"] == "test-model"
+    # Unchanged modules keep their config object, so loaded graders stay valid
+    assert registry.get_module_config("Database Module") is existing
+
+
+def test_register_persists_by_default(modules_file, config):
+    registry.register_module({k: v for k, v in config.items() if k != "prompt_version"})
+
+    names = [module["name"] for module in json.loads(modules_file.read_text())]
+    assert "Test Module" in names
+    assert not registry.reload_if_changed(force=True)
+
+
+def test_persist_writes_configs_as_given(modules_file, monkeypatch):
+    original = json.loads(modules_file.read_text())
+    registry.register_module({
+        "name": "Raw Module",
+        "key": "raw",
+        "corpus_path": "data/dbms_questions.json",
+        "index_path": "indexes/raw_index",
+        "llm": {"model": "test-model"},
+        "prompt": {"persona": "You are a strict examiner.", "instructions": "Grade the answer out of 10."},
+    })
+
+    saved = json.loads(modules_file.read_text())
+    assert saved[:len(original)] == original
+    assert set(saved[-1]) == {"name", "key", "corpus_path", "index_path", "llm", "prompt"}
+
+    # Defaults still apply to saved modules when they change
+    monkeypatch.setattr(registry, "GRADER_PROMPT_LAYOUT", "legacy")
+    monkeypatch.setattr(registry, "_modules", {})
+    registry.load_modules()
+    assert registry.get_module_config("Raw Module")["prompt_layout"] == "legacy"
+
+
+def test_unknown_module_still_rejected(modules_file):
+    with pytest.raises(ValueError, match="Unsupported module"):
+        registry.get_module_config("No Such Module")
+
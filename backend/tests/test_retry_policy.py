@@ -0,0 +1,52 @@
+from grader import registry, retry_policy
+
+
+def _telemetry(*results):
+    telemetry = retry_policy.new_telemetry()
+    for result in results:
+        telemetry = retry_policy.record_attempt(telemetry, {"tokens": 100, "completion_tokens": 20, **result}, 1.0, 1.0)
+    return telemetry
+
+
+def _decide(config, *results):
+    telemetry = _telemetry(*results)
+    return retry_policy.get_policy(config).decide(config, telemetry)[:2], telemetry
+
+
+UNPARSED = {"score": None, "parse_ok": False}
+
+
+def test_readable_score_accepted(config):
+    assert _decide(config, {"score": 2.0, "parse_ok": True})[0] == (False, "accepted")
+
+
+def test_parse_failure_retried_until_limit(config):
+    assert _decide(config, UNPARSED)[0] == (True, "parse_failure")
+
+    limit = config["retry_policy"]["max_retries"]
+    telemetry = _telemetry(*[UNPARSED] * (limit + 1))
+    telemetry["retries"] = limit
+    retry, reason, _ = retry_policy.get_policy(config).decide(config, telemetry)
+    assert (retry, reason) == (False, "retry_limit")
+    assert telemetry["scores"] == [None] * (limit + 1) and telemetry["parse_failures"] == limit + 1
+
+
+def test_token_budget_stops_retries(config):
+    config = registry.normalize_config({**config, "retry_policy": {**config["retry_policy"], "token_budget": 150}})
+    assert _decide(config, UNPARSED)[0] == (False, "token_budget")
+
+
+def test_stable_low_score_not_retried(config):
+    config = registry.normalize_config({**config, "retry_policy": {**config["retry_policy"], "retry_low_score": True}})
+    assert _decide(config, {"score": 2.0, "parse_ok": True})[0] == (True, "low_score")
+    assert _decide(config, {"score": 2.0, "parse_ok": True}, {"score": 2.5, "parse_ok": True})[0] == (False, "stable_low_score")
+
+
+def test_saturated_host_stops_low_score_retry(config, monkeypatch):
+    settings = {**config["retry_policy"], "retry_low_score": True, "saturation_inflight": 2}
+    config = registry.normalize_config({**config, "retry_policy": settings})
+    monkeypatch.setattr(retry_policy, "inflight", lambda model: 5)
+
+    assert _decide(config, {"score": 2.0, "parse_ok": True})[0] == (False, "saturated")
+    (retry, reason), _ = _decide(config, UNPARSED)
+    assert (retry, reason) == (True, "parse_failure")
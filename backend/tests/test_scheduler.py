@@ -0,0 +1,26 @@
+import asyncio
+
+from grader import scheduler
+
+
+async def _grants(sole_client):
+    host = scheduler.HostScheduler(1, 1, policy="affinity", sole_client=sole_client)
+    first = asyncio.ensure_future(host.acquire("mistral:7b"))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(host.acquire("mistral:7b"))
+    waiting = asyncio.ensure_future(host.acquire("llama3:8b"))
+    await asyncio.sleep(0)
+    await first
+    host.release("mistral:7b")
+    keep_alive = await second
+    host.release("mistral:7b")
+    await waiting
+    return keep_alive
+
+
+def test_shared_host_keeps_switched_away_model_loaded():
+    assert asyncio.run(_grants(sole_client=False)) == scheduler.OLLAMA_KEEP_ALIVE_ACTIVE
+
+
+def test_sole_client_releases_model_it_switches_away_from():
+    assert asyncio.run(_grants(sole_client=True)) == scheduler.OLLAMA_KEEP_ALIVE_RELEASE
@@ -0,0 +1,7 @@
+from backtask.worker import restart_delay
+
+
+def test_restart_backoff():
+    assert restart_delay(0) == 0
+    assert [restart_delay(n) for n in (1, 2, 3)] == [1, 2, 4]
+    assert restart_delay(30) == 300